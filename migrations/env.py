@@ -7,10 +7,12 @@ from sqlalchemy import pool
 from alembic import context
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from src.db.models.content_rollup import ContentRollup
 from src.db.models.exercise import Exercise
 from src.db.models.post import Post
 from src.db.models.base import Base
 from src.db.models.user import User
+from src.db.models.user_counters import UserCounters
 from src.settings import settings
 
 # this is the Alembic Config object, which provides
@@ -28,6 +30,21 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Text search objects are dialect specific and created by hand in the
+# migrations, keep autogenerate from dropping them.
+UNMANAGED_OBJECT_PREFIXES = (
+    "search_vector",
+    "ix_posts_search_vector",
+    "posts_fts",
+    "ix_users_name_trgm",
+    "users_name_fts",
+)
+
+
+def include_object(object_, name, type_, reflected, compare_to):
+    return not (reflected and name and name.startswith(UNMANAGED_OBJECT_PREFIXES))
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -50,6 +67,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -60,7 +78,10 @@ def run_migrations_offline() -> None:
 
 def do_run_migrations(connection):
     context.configure(
-        connection=connection, target_metadata=target_metadata, compare_type=True
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        compare_type=True,
     )
 
     with context.begin_transaction():
@@ -0,0 +1,32 @@
+"""updated_at for etags
+
+Revision ID: 29dc284e6b8a
+Revises: fe9b535469e9
+Create Date: 2026-10-18 14:02:37.118254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "29dc284e6b8a"
+down_revision = "fe9b535469e9"
+branch_labels = None
+depends_on = None
+
+TABLES = ("users", "posts", "exercises")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+        # Existing rows get a version too, so their first ETag is stable
+        op.execute(
+            sa.text(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP")
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, "updated_at")
@@ -0,0 +1,60 @@
+"""daily content rollups
+
+Revision ID: 2e700c21d435
+Revises: 771aea9d158b
+Create Date: 2026-10-18 16:48:26.915402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2e700c21d435"
+down_revision = "771aea9d158b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "content_rollups",
+        sa.Column(
+            "kind",
+            sa.Enum("POST", "EXERCISE", name="contentkindsenum"),
+            nullable=False,
+        ),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("owner", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["owner"],
+            ["users.id"],
+            name=op.f("fk_content_rollups_owner_users"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "kind", "day", "owner", name=op.f("pk_content_rollups")
+        ),
+    )
+    # Enum columns store member names
+    op.execute(
+        """
+        INSERT INTO content_rollups (kind, day, owner, count)
+        SELECT 'POST', date(time), owner, count(*)
+        FROM posts GROUP BY date(time), owner
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO content_rollups (kind, day, owner, count)
+        SELECT 'EXERCISE', date(time), owner, count(*)
+        FROM exercises GROUP BY date(time), owner
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("content_rollups")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TYPE contentkindsenum")
@@ -0,0 +1,25 @@
+"""posts time id index
+
+Revision ID: 4f8a2c6d9e13
+Revises: b7d3e1f29c04
+Create Date: 2026-10-19 10:05:21.604117
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "4f8a2c6d9e13"
+down_revision = "b7d3e1f29c04"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_posts_time_id"), "posts", ["time", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_posts_time_id"), table_name="posts")
@@ -0,0 +1,49 @@
+"""composite indexes for hot queries
+
+Revision ID: 70b67609969f
+Revises: a4688c67a62c
+Create Date: 2026-10-18 11:30:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "70b67609969f"
+down_revision = "a4688c67a62c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Primary keys are already backed by a unique index
+    op.drop_index(op.f("ix_users_id"), table_name="users")
+    op.drop_index(op.f("ix_exercises_id"), table_name="exercises")
+    op.drop_index(op.f("ix_posts_id"), table_name="posts")
+
+    # (owner, time) serves both owner lookups and "owner's items by time",
+    # so the single-column owner indexes become redundant
+    op.create_index(
+        op.f("ix_exercises_owner_time"), "exercises", ["owner", "time"], unique=False
+    )
+    op.drop_index(op.f("ix_exercises_owner"), table_name="exercises")
+    op.create_index(
+        op.f("ix_posts_owner_time"), "posts", ["owner", "time"], unique=False
+    )
+    op.drop_index(op.f("ix_posts_owner"), table_name="posts")
+    op.create_index(
+        op.f("ix_posts_status_time"), "posts", ["status", "time"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_posts_status_time"), table_name="posts")
+    op.create_index(op.f("ix_posts_owner"), "posts", ["owner"], unique=False)
+    op.drop_index(op.f("ix_posts_owner_time"), table_name="posts")
+    op.create_index(op.f("ix_exercises_owner"), "exercises", ["owner"], unique=False)
+    op.drop_index(op.f("ix_exercises_owner_time"), table_name="exercises")
+
+    op.create_index(op.f("ix_posts_id"), "posts", ["id"], unique=True)
+    op.create_index(op.f("ix_exercises_id"), "exercises", ["id"], unique=True)
+    op.create_index(op.f("ix_users_id"), "users", ["id"], unique=True)
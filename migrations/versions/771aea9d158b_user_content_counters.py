@@ -0,0 +1,61 @@
+"""user content counters
+
+Revision ID: 771aea9d158b
+Revises: af64c268d105
+Create Date: 2026-10-18 16:05:12.337940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "771aea9d158b"
+down_revision = "af64c268d105"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("exercises", sa.Column("duration", sa.Integer(), nullable=True))
+    op.create_table(
+        "user_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("posts_waiting", sa.Integer(), nullable=False),
+        sa.Column("posts_approved", sa.Integer(), nullable=False),
+        sa.Column("posts_rejected", sa.Integer(), nullable=False),
+        sa.Column("exercises", sa.Integer(), nullable=False),
+        sa.Column("meditation_seconds", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+            name=op.f("fk_user_counters_user_id_users"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("user_id", name=op.f("pk_user_counters")),
+    )
+    # Enum columns store member names
+    op.execute(
+        """
+        INSERT INTO user_counters (
+            user_id, posts_waiting, posts_approved, posts_rejected,
+            exercises, meditation_seconds
+        )
+        SELECT
+            users.id,
+            (SELECT count(*) FROM posts
+             WHERE posts.owner = users.id AND posts.status = 'WAITING'),
+            (SELECT count(*) FROM posts
+             WHERE posts.owner = users.id AND posts.status = 'APPROVED'),
+            (SELECT count(*) FROM posts
+             WHERE posts.owner = users.id AND posts.status = 'REJECTED'),
+            (SELECT count(*) FROM exercises WHERE exercises.owner = users.id),
+            0
+        FROM users
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_counters")
+    op.drop_column("exercises", "duration")
@@ -0,0 +1,40 @@
+"""post moderation claims
+
+Revision ID: af64c268d105
+Revises: 29dc284e6b8a
+Create Date: 2026-10-18 15:20:48.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "af64c268d105"
+down_revision = "29dc284e6b8a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("claimed_by", sa.Integer(), nullable=True))
+    op.add_column("posts", sa.Column("claimed_until", sa.DateTime(), nullable=True))
+    # SQLite can't add constraints to an existing table, and a batch
+    # rebuild would drop the full-text search triggers on posts
+    if op.get_bind().dialect.name != "sqlite":
+        op.create_foreign_key(
+            op.f("fk_posts_claimed_by_users"),
+            "posts",
+            "users",
+            ["claimed_by"],
+            ["id"],
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_constraint(
+            op.f("fk_posts_claimed_by_users"), "posts", type_="foreignkey"
+        )
+    op.drop_column("posts", "claimed_until")
+    op.drop_column("posts", "claimed_by")
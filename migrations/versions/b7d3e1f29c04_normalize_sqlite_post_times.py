@@ -0,0 +1,29 @@
+"""normalize sqlite post times
+
+Revision ID: b7d3e1f29c04
+Revises: 2e700c21d435
+Create Date: 2026-10-19 09:12:40.118530
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b7d3e1f29c04"
+down_revision = "2e700c21d435"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CURRENT_TIMESTAMP stored "YYYY-MM-DD HH:MM:SS" while bound datetimes
+    # carry microseconds, so text comparisons in keyset pagination treated
+    # equal times as different
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            "UPDATE posts SET time = time || '.000000' WHERE length(time) = 19"
+        )
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,88 @@
+"""full-text search over posts
+
+Revision ID: c5c0bd07afb2
+Revises: 70b67609969f
+Create Date: 2026-10-18 12:04:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c5c0bd07afb2"
+down_revision = "70b67609969f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            """
+            ALTER TABLE posts ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+            ) STORED
+            """
+        )
+        op.create_index(
+            "ix_posts_search_vector",
+            "posts",
+            ["search_vector"],
+            postgresql_using="gin",
+        )
+    elif dialect == "sqlite":
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE posts_fts USING fts5(
+                title, description, content='posts', content_rowid='id'
+            )
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+                INSERT INTO posts_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, description ON posts
+            BEGIN
+                INSERT INTO posts_fts (posts_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO posts_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END
+            """
+        )
+        # Weight title matches over description ones, like the tsvector above
+        op.execute(
+            "INSERT INTO posts_fts (posts_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"
+        )
+        op.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_posts_search_vector", table_name="posts")
+        op.drop_column("posts", "search_vector")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS posts_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS posts_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS posts_fts_ai")
+        op.execute("DROP TABLE IF EXISTS posts_fts")
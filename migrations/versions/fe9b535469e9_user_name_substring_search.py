@@ -0,0 +1,74 @@
+"""user name substring search
+
+Revision ID: fe9b535469e9
+Revises: c5c0bd07afb2
+Create Date: 2026-10-18 12:41:09.553870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "fe9b535469e9"
+down_revision = "c5c0bd07afb2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_users_name_trgm",
+            "users",
+            ["name"],
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        )
+    elif dialect == "sqlite":
+        # The trigram tokenizer (SQLite >= 3.34) serves LIKE '%...%' lookups
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE users_name_fts USING fts5(
+                name, content='users', content_rowid='id', tokenize='trigram'
+            )
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER users_name_fts_ai AFTER INSERT ON users BEGIN
+                INSERT INTO users_name_fts (rowid, name) VALUES (new.id, new.name);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER users_name_fts_ad AFTER DELETE ON users BEGIN
+                INSERT INTO users_name_fts (users_name_fts, rowid, name)
+                VALUES ('delete', old.id, old.name);
+            END
+            """
+        )
+        op.execute(
+            """
+            CREATE TRIGGER users_name_fts_au AFTER UPDATE OF name ON users BEGIN
+                INSERT INTO users_name_fts (users_name_fts, rowid, name)
+                VALUES ('delete', old.id, old.name);
+                INSERT INTO users_name_fts (rowid, name) VALUES (new.id, new.name);
+            END
+            """
+        )
+        op.execute("INSERT INTO users_name_fts (users_name_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_users_name_trgm", table_name="users")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS users_name_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS users_name_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS users_name_fts_ai")
+        op.execute("DROP TABLE IF EXISTS users_name_fts")
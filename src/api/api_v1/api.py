@@ -6,6 +6,8 @@ from .endpoints import (
     users,
     posts,
     exercises,
+    statistics,
+    uploads,
 )
 
 api_router = APIRouter()
@@ -14,3 +16,7 @@ api_router.include_router(healthcheck.router, tags=["health"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(posts.router, prefix="/posts", tags=["posts"])
 api_router.include_router(exercises.router, prefix="/exercises", tags=["exercises"])
+api_router.include_router(
+    statistics.router, prefix="/statistics", tags=["statistics"]
+)
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
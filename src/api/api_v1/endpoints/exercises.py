@@ -1,28 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
+from api.api_v1.endpoints.users import FORBIDDEN
 from api.deps import ExerciseCrudSession, CurrentActiveUser, CurrentSuperUser
+from db.crud.exercise_crud import ExerciseCrud
+from db.crud.user_crud import UserCrud
 from db.schemas.exercise_schema import (
     ExerciseCreate,
     ExerciseRead,
     ExerciseReadResponse,
+    ExerciseStats,
     ExerciseUpdate,
 )
+from schemas.common_schema import CursorPage, CursorParams, IExportFormatEnum
+from services.etag import etag_matches, not_modified
+from services.export import export_response
+from services.responses import fast_json_response
+from settings import settings
 
 router = APIRouter()
 
 
+@router.get("/export", response_class=StreamingResponse)
+async def export_exercises(
+    current_user: CurrentActiveUser,
+    export_format: IExportFormatEnum = Query(IExportFormatEnum.ndjson, alias="format"),
+):
+    """
+    Stream all exercises of the current user as NDJSON or CSV.
+    """
+    return export_response(
+        ExerciseCrud.export_query(owner=current_user.id),
+        export_format,
+        filename="exercises",
+        principal_id=current_user.id,
+    )
+
+
 @router.get("/{exercise_id}", response_model=ExerciseReadResponse)
 async def get_exercise_by_id(
     exercise_id: int,
+    request: Request,
+    response: Response,
     exercise_crud: ExerciseCrudSession,
 ):
+    etag = await exercise_crud.get_exercise_etag(exercise_id=exercise_id)
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+
     exercise = await exercise_crud.get(id_=exercise_id)
     if not exercise:
         raise HTTPException(
             status_code=404,
             detail="Exercise doesn't exist.",
         )
-    return ExerciseRead.from_orm(exercise)
+    response.headers["ETag"] = etag
+    return fast_json_response(ExerciseRead.from_orm(exercise), response=response)
 
 
 @router.post("/")
@@ -34,10 +67,24 @@ async def create_exercise(
     return await exercise_crud.create_exercise(exercise_in=exercise, current_user=current_user)
 
 
+@router.post("/bulk")
+async def create_exercises_bulk(
+    current_user: CurrentActiveUser,
+    exercise_crud: ExerciseCrudSession,
+    exercises: list[ExerciseCreate] = Body(
+        ..., min_items=1, max_items=settings.BULK_MAX_ITEMS
+    ),
+):
+    return await exercise_crud.create_exercises(
+        exercises_in=exercises, current_user=current_user
+    )
+
+
 @router.put("/{exercise_id}")
 async def update_exercise(
     exercise_id: int,
     exercise_crud: ExerciseCrudSession,
+    current_user: CurrentActiveUser,
     exercise_in: ExerciseUpdate = Depends(),
 ):
     exercise = await exercise_crud.get(id_=exercise_id)
@@ -46,20 +93,54 @@ async def update_exercise(
             status_code=404,
             detail="Exercise doesn't exist.",
         )
+
+    if current_user.id != exercise.owner and not UserCrud.is_superuser(current_user):
+        raise FORBIDDEN
+
     return await exercise_crud.update_exercise_info(
         db_exercise=exercise,
         exercise_in=exercise_in,
     )
 
 
-@router.get("/all/")
+@router.get("/all/", response_model=CursorPage[ExerciseReadResponse])
 async def get_exercises_for_user(
     current_user: CurrentActiveUser,
     exercise_crud: ExerciseCrudSession,
+    params: CursorParams = Depends(),
 ):
-    return await exercise_crud.get_exercises_by_owner(owner=current_user.id)
+    return fast_json_response(
+        await exercise_crud.get_exercises_by_owner(
+            owner=current_user.id,
+            params=params,
+        )
+    )
+
+
+@router.get("/stats/", response_model=ExerciseStats)
+async def get_exercise_stats(
+    current_user: CurrentActiveUser,
+    exercise_crud: ExerciseCrudSession,
+):
+    """
+    Practice streaks and totals of the current user.
+    """
+    return fast_json_response(
+        await exercise_crud.get_exercise_stats(owner=current_user.id)
+    )
 
 
 @router.get("/daily/", response_model=ExerciseReadResponse | None)
-async def get_daily_exercise(exercise_crud: ExerciseCrudSession):
-    return await exercise_crud.get_daily_exercise()
+async def get_daily_exercise(
+    request: Request,
+    response: Response,
+    exercise_crud: ExerciseCrudSession,
+):
+    etag = await exercise_crud.get_daily_exercise_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    return fast_json_response(
+        await exercise_crud.get_daily_exercise(), response=response
+    )
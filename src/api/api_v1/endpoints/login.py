@@ -1,7 +1,7 @@
 from datetime import timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.security import OAuth2PasswordRequestForm
 
 from api.deps import (
@@ -10,6 +10,7 @@ from api.deps import (
 from auth.jwthandler import create_access_token
 from db.schemas.user_schema import UserCreate, UserReadResponse
 from schemas import token as token_schema
+from services.responses import fast_json_response
 from settings import settings
 
 router = APIRouter()
@@ -19,6 +20,7 @@ router = APIRouter()
 async def create_user(
     user: UserCreate,
     user_crud: UserCrudSession,
+    response: Response,
 ):
     """
     Create new user.
@@ -33,7 +35,9 @@ async def create_user(
     if isinstance(result, dict):
         raise HTTPException(status_code=400, detail=result)
 
-    return result
+    return fast_json_response(
+        UserReadResponse.from_orm(result), status_code=201, response=response
+    )
 
 
 @router.post("/access-token", response_model=token_schema.Token)
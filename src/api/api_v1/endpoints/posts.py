@@ -1,30 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi_pagination import Page, Params
 
 from api.api_v1.endpoints.users import FORBIDDEN
 from api.deps import PostCrudSession, CurrentActiveUser, CurrentSuperUser
-from db.models.post import Post
+from db.crud.post_crud import PostCrud
 from db.schemas.post_schema import (
     PostCreate,
-    PostRead,
     PostReadResponse,
     PostUpdate,
     PostAdminUpdate,
     PostAdminCreate, PostFilter,
+    PostAdminBulkStatusUpdate,
+    PostAdminBulkStatusUpdateResult,
+    PostModerationBatch,
 )
+from schemas.common_schema import CursorPage, CursorParams, IExportFormatEnum
+from services.etag import etag_matches, not_modified
+from services.export import export_response
+from services.responses import fast_json_response
+from settings import settings
 
 router = APIRouter()
 POST_NOT_FOUND = HTTPException(status_code=404, detail="Post doesn't exist.")
 
 
+@router.get("/search", response_model=Page[PostReadResponse])
+async def search_posts(
+    post_crud: PostCrudSession,
+    q: str = Query(..., max_length=200, regex=r"\S", description="Searched text"),
+    params: Params = Depends(),
+) -> Page[PostReadResponse]:
+    """
+    Full-text search over post titles and descriptions, best matches first.
+    """
+    return fast_json_response(
+        await post_crud.search_posts(search=q, params=params)
+    )
+
+
+@router.get("/feed", response_model=CursorPage[PostReadResponse])
+async def get_approved_feed(
+    post_crud: PostCrudSession,
+    params: CursorParams = Depends(),
+) -> CursorPage[PostReadResponse]:
+    """
+    Approved posts, newest first, one cursor page at a time.
+    """
+    return fast_json_response(await post_crud.get_approved_feed(params=params))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_posts(
+    current_super_user: CurrentSuperUser,
+    export_format: IExportFormatEnum = Query(IExportFormatEnum.ndjson, alias="format"),
+):
+    """
+    Stream every post as NDJSON or CSV.
+    """
+    return export_response(
+        PostCrud.export_query(),
+        export_format,
+        filename="posts",
+        principal_id=current_super_user.id,
+    )
+
+
 @router.get("/{post_id}", response_model=PostReadResponse)
 async def get_post_by_id(
     post_id: int,
+    request: Request,
+    response: Response,
     post_crud: PostCrudSession,
 ):
+    etag = await post_crud.get_post_etag(post_id=post_id)
+    if not etag:
+        raise POST_NOT_FOUND
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     post = await post_crud.get_post(post_id=post_id)
     if not post:
         raise POST_NOT_FOUND
-    return PostRead.from_orm(post)
+    response.headers["ETag"] = etag
+    return fast_json_response(post, response=response)
 
 
 @router.post("/")
@@ -71,6 +130,59 @@ async def create_post_admin(
     )
 
 
+@router.post("/admin/bulk")
+async def create_posts_admin_bulk(
+    current_super_user: CurrentSuperUser,
+    post_crud: PostCrudSession,
+    posts: list[PostAdminCreate] = Body(
+        ..., min_items=1, max_items=settings.BULK_MAX_ITEMS
+    ),
+):
+    return await post_crud.create_posts_admin(
+        posts_in=posts,
+        current_user=current_super_user,
+    )
+
+
+@router.put("/admin/bulk", response_model=PostAdminBulkStatusUpdateResult)
+async def update_posts_status_admin(
+    posts_in: PostAdminBulkStatusUpdate,
+    _current_super_user: CurrentSuperUser,
+    post_crud: PostCrudSession,
+) -> PostAdminBulkStatusUpdateResult:
+    """
+    Approve or reject many posts with a single UPDATE.
+    """
+    return fast_json_response(
+        await post_crud.update_posts_status(
+            post_ids=posts_in.ids,
+            status=posts_in.status,
+        )
+    )
+
+
+@router.post("/admin/moderation/claim", response_model=PostModerationBatch)
+async def claim_posts_for_moderation(
+    current_super_user: CurrentSuperUser,
+    post_crud: PostCrudSession,
+    limit: int = Query(
+        settings.MODERATION_CLAIM_SIZE, ge=1, le=settings.BULK_MAX_ITEMS
+    ),
+) -> PostModerationBatch:
+    """
+    Reserve the oldest posts waiting for review for the current moderator.
+
+    Claimed posts are skipped by other moderators until they are approved
+    or rejected, or until `claimed_until` passes.
+    """
+    return fast_json_response(
+        await post_crud.claim_waiting_posts(
+            current_user=current_super_user,
+            limit=limit,
+        )
+    )
+
+
 @router.put("/admin/{post_id}")
 async def update_post_admin(
         post_id: int,
@@ -88,15 +200,18 @@ async def update_post_admin(
     )
 
 
-@router.get("/", response_model=list[PostReadResponse] | None)
+@router.get("/", response_model=CursorPage[PostReadResponse])
 async def get_all_posts(
     post_crud: PostCrudSession,
     posts_filter: PostFilter = Depends(),
-) -> list[PostReadResponse] | None:
+    params: CursorParams = Depends(),
+) -> CursorPage[PostReadResponse]:
     """
-    Retrieve all users.
+    Retrieve posts, newest first, one cursor page at a time.
     """
-    return await post_crud.get_all_posts_ordered(
-        posts_filter=posts_filter,
-        order_by=Post.time,
+    return fast_json_response(
+        await post_crud.get_all_posts_ordered(
+            posts_filter=posts_filter,
+            params=params,
+        )
     )
@@ -0,0 +1,135 @@
+from datetime import date, datetime, timedelta
+
+from fastapi import APIRouter, HTTPException, Query
+
+from api.deps import ContentRollupCrudSession, CurrentSuperUser
+from db.models.content_rollup import ContentKindsEnum
+from schemas.common_schema import IPeriodEnum
+from schemas.statistic_schema import (
+    ExercisesByTimeChunk,
+    ExercisesByUser,
+    TopicsByJournalist,
+    TopicsByTimeChunk,
+)
+from services.responses import fast_json_response
+from settings import settings
+
+router = APIRouter()
+
+
+def _date_range(date_from: date | None, date_to: date | None) -> tuple[date, date]:
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(
+        days=settings.STATISTICS_DEFAULT_DAYS - 1
+    )
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=400,
+            detail="date_from must not be after date_to.",
+        )
+    if (date_to - date_from).days >= settings.STATISTICS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"The range can't be longer than {settings.STATISTICS_MAX_DAYS} days."
+            ),
+        )
+    return date_from, date_to
+
+
+@router.get("/posts/by-time", response_model=list[TopicsByTimeChunk])
+async def get_posts_by_time(
+    _current_super_user: CurrentSuperUser,
+    rollup_crud: ContentRollupCrudSession,
+    period: IPeriodEnum = IPeriodEnum.day,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    """
+    Posts created per day, week or month, read from the daily rollups.
+    """
+    date_from, date_to = _date_range(date_from, date_to)
+    chunks = await rollup_crud.get_by_period(
+        ContentKindsEnum.POST, period, date_from, date_to
+    )
+    return fast_json_response(
+        [
+            TopicsByTimeChunk(
+                date_start=datetime.combine(start, datetime.min.time()),
+                topics_count=count,
+            )
+            for start, count in chunks
+        ]
+    )
+
+
+@router.get("/posts/by-author", response_model=list[TopicsByJournalist])
+async def get_posts_by_author(
+    _current_super_user: CurrentSuperUser,
+    rollup_crud: ContentRollupCrudSession,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Authors with the most posts created in the range, most active first.
+    """
+    date_from, date_to = _date_range(date_from, date_to)
+    authors = await rollup_crud.get_by_author(
+        ContentKindsEnum.POST, date_from, date_to, limit
+    )
+    return fast_json_response(
+        [
+            TopicsByJournalist(username=name, topics_count=count)
+            for name, count in authors
+        ]
+    )
+
+
+@router.get("/exercises/by-time", response_model=list[ExercisesByTimeChunk])
+async def get_exercises_by_time(
+    _current_super_user: CurrentSuperUser,
+    rollup_crud: ContentRollupCrudSession,
+    period: IPeriodEnum = IPeriodEnum.day,
+    date_from: date | None = None,
+    date_to: date | None = None,
+):
+    """
+    Exercises done per day, week or month, read from the daily rollups.
+    """
+    date_from, date_to = _date_range(date_from, date_to)
+    chunks = await rollup_crud.get_by_period(
+        ContentKindsEnum.EXERCISE, period, date_from, date_to
+    )
+    return fast_json_response(
+        [
+            ExercisesByTimeChunk(
+                date_start=datetime.combine(start, datetime.min.time()),
+                exercises_count=count,
+            )
+            for start, count in chunks
+        ]
+    )
+
+
+@router.get("/exercises/by-author", response_model=list[ExercisesByUser])
+async def get_exercises_by_author(
+    _current_super_user: CurrentSuperUser,
+    rollup_crud: ContentRollupCrudSession,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Users with the most exercises done in the range, most active first.
+    """
+    date_from, date_to = _date_range(date_from, date_to)
+    authors = await rollup_crud.get_by_author(
+        ContentKindsEnum.EXERCISE, date_from, date_to, limit
+    )
+    return fast_json_response(
+        [
+            ExercisesByUser(username=name, exercises_count=count)
+            for name, count in authors
+        ]
+    )
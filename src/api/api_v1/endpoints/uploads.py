@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Request, Response, status
+
+from api.deps import CurrentActiveUserWithoutSession
+from schemas.upload_schema import UploadRead
+from services.responses import fast_json_response
+from services.uploads import store_upload, upload_response
+from settings import settings
+
+router = APIRouter()
+
+
+@router.post("/", response_model=UploadRead, status_code=status.HTTP_201_CREATED)
+async def upload_image(
+    request: Request,
+    response: Response,
+    _current_user: CurrentActiveUserWithoutSession,
+):
+    """
+    Store the `file` part of a multipart body. The returned `url` can be
+    used as a post or exercise photo, or as an avatar. No database session
+    is held while the body streams in.
+    """
+    upload = await store_upload(request)
+    return fast_json_response(
+        UploadRead(
+            name=upload.name,
+            url=f"{settings.API_V1_STR}/uploads/{upload.name}",
+            size=upload.size,
+            content_type=upload.media_type,
+        ),
+        status_code=status.HTTP_201_CREATED if upload.created else status.HTTP_200_OK,
+        response=response,
+    )
+
+
+@router.get("/{name}", response_class=Response)
+async def get_upload(name: str, request: Request):
+    return await upload_response(request, name)
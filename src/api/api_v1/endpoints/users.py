@@ -1,6 +1,6 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.encoders import jsonable_encoder
 from starlette import status
 
@@ -9,13 +9,16 @@ from api.deps import (
     UserCrudSession,
     CurrentSuperUser,
 )
-from db.models.user import User
 from db.schemas.user_schema import (
+    UserDetailedResponse,
     UserFilter,
     UserReadResponse,
     UserUpdate,
     UserUpdateMe,
 )
+from schemas.common_schema import CursorPage, CursorParams
+from services.etag import etag_matches, not_modified
+from services.responses import fast_json_response
 
 router = APIRouter()
 FORBIDDEN = HTTPException(
@@ -23,45 +26,54 @@ FORBIDDEN = HTTPException(
 )
 
 
-@router.get("/{user_id}")
+@router.get("/{user_id}", response_model=UserReadResponse)
 async def read_user(
     user_id: int,
+    request: Request,
+    response: Response,
     user_crud: UserCrudSession,
 ):
     """
     Get user by id.
     """
+    etag = await user_crud.get_user_etag(user_id=user_id)
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
 
     user = await user_crud.get(id_=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
-    return user
+    response.headers["ETag"] = etag
+    return fast_json_response(UserReadResponse.from_orm(user), response=response)
 
 
-@router.get("/admin/", response_model=list[UserReadResponse] | None)
+@router.get("/admin/", response_model=CursorPage[UserReadResponse])
 async def get_all_users(
     user_crud: UserCrudSession,
     _current_super_user: CurrentSuperUser,
     users_filter: UserFilter = Depends(),
-) -> list[UserReadResponse] | None:
+    params: CursorParams = Depends(),
+) -> CursorPage[UserReadResponse]:
     """
-    Retrieve all users.
+    Retrieve users, one cursor page at a time.
     """
-    return await user_crud.get_all_users_ordered(
-        users_filter=users_filter,
-        order_by=User.name,
+    return fast_json_response(
+        await user_crud.get_all_users_ordered(
+            users_filter=users_filter,
+            params=params,
+        )
     )
 
 
-@router.get("/me/")
+@router.get("/me/", response_model=UserDetailedResponse)
 async def read_user_me(
     user_crud: UserCrudSession,
     current_user: CurrentUser,
 ):
     """
-    Get current user.
+    Get current user along with their content counters.
     """
-    return await user_crud.get_detailed(id_=current_user.id)
+    return fast_json_response(await user_crud.get_detailed(id_=current_user.id))
 
 
 @router.put("/me/", response_model=UserReadResponse)
@@ -78,7 +90,8 @@ async def update_user_me(
     user_in = UserUpdate(**current_user_data)
     if user_in_me.password is not None:
         user_in.password = user_in_me.password
-    return await user_crud.update(db_obj=current_user, obj_in=user_in)
+    user = await user_crud.update(db_obj=current_user, obj_in=user_in)
+    return fast_json_response(UserReadResponse.from_orm(user))
 
 
 @router.put("/{user_id}", response_model=UserReadResponse)
@@ -98,4 +111,4 @@ async def update_user(
             detail="The user with this username does not exist in the system",
         )
     user = await user_crud.update(db_obj=user, obj_in=user_in)
-    return user
+    return fast_json_response(UserReadResponse.from_orm(user))
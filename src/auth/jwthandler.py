@@ -6,14 +6,14 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
 
+from auth.principal_cache import principal_cache
+from auth.tokens import ALGORITHM, decode_access_token
+from db.config import ReadOnlySessionLocal, set_session_principal
 from db.crud.user_crud import UserCrud
 from db.models.user import User
 from dependencies import get_user_crud
-from schemas import token as token_schema
 from settings import settings
 
-ALGORITHM = "HS256"
-
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/access-token", scheme_name="JWT"
 )
@@ -37,17 +37,28 @@ async def get_current_user(
     user_crud: UserCrud = Depends(get_user_crud),
     token: str = Depends(reusable_oauth2),
 ) -> User:
+    return await _resolve_user(user_crud, token)
+
+
+async def _resolve_user(user_crud: UserCrud, token: str) -> User:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        token_data = token_schema.TokenPayload(**payload)
+        token_data = decode_access_token(token)
     except (JWTError, ValidationError) as exc:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         ) from exc
+    # Route this request's reads with the principal's read-your-writes window
+    set_session_principal(user_crud.db, token_data.sub)
+
+    user = principal_cache.get(token_data.sub)
+    if user:
+        return user
+
     user = await user_crud.get(id_=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    principal_cache.set(user)
     return user
 
 
@@ -59,10 +70,23 @@ def get_current_active_user(
 
 def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
-    user_crud: UserCrud = Depends(get_user_crud),
 ) -> User:
-    if not user_crud.is_superuser(current_user):
+    if not UserCrud.is_superuser(current_user):
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+async def get_current_active_user_without_session(
+    token: str = Depends(reusable_oauth2),
+) -> User:
+    """
+    Like `get_current_active_user`, but looks the user up in its own
+    autocommit session that is closed again before the endpoint runs.
+    For long requests that don't use the database themselves, such as
+    uploads, which would otherwise keep the request transaction and its
+    connection open until the response is sent.
+    """
+    async with ReadOnlySessionLocal() as session:
+        return await _resolve_user(UserCrud(session), token)
@@ -0,0 +1,27 @@
+from fastapi.security.utils import get_authorization_scheme_param
+from jose import JWTError, jwt
+from pydantic import ValidationError
+
+from schemas import token as token_schema
+from settings import settings
+
+ALGORITHM = "HS256"
+
+
+def decode_access_token(token: str) -> token_schema.TokenPayload:
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    return token_schema.TokenPayload(**payload)
+
+
+def get_bearer_subject(authorization: str | None) -> int | None:
+    """
+    Subject of a valid bearer token in an Authorization header, None for
+    anonymous requests and anything that doesn't verify.
+    """
+    scheme, token = get_authorization_scheme_param(authorization)
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_access_token(token).sub
+    except (JWTError, ValidationError):
+        return None
@@ -1,8 +1,21 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from settings import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a thread pool runs hashes in parallel
+_hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix="password-hashing",
+)
+_hashing_in_flight = 0
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -10,3 +23,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+async def _run_hashing(func: Callable[..., Any], *args: Any) -> Any:
+    global _hashing_in_flight  # pylint: disable=global-statement
+
+    limit = settings.PASSWORD_HASHING_WORKERS + settings.PASSWORD_HASHING_QUEUE_SIZE
+    if _hashing_in_flight >= limit:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent authentication requests, try again later.",
+            headers={"Retry-After": "1"},
+        )
+
+    _hashing_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hashing_executor, func, *args)
+    finally:
+        _hashing_in_flight -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hashing(get_password_hash, password)
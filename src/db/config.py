@@ -1,30 +1,188 @@
 import logging
-from typing import AsyncIterator
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
 
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import InvalidRequestError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
 
 from settings import settings
 
 logger = logging.getLogger(__name__)
 DATABASE_URL = settings.DATABASE_URL
 
-# For SQLite only connect_args={"check_same_thread": False}
-engine = create_async_engine(
-    DATABASE_URL,
+
+def _create_engine(url: str) -> AsyncEngine:
+    pool_options = {}
+    # SQLite uses a NullPool/StaticPool which doesn't accept sizing options
+    if make_url(url).get_backend_name() != "sqlite":
+        pool_options = {"pool_size": 10, "max_overflow": 20}
+    return create_async_engine(
+        url,
+        future=True,
+        echo=settings.ECHO_SQL,
+        **pool_options,
+    )
+
+
+engine = _create_engine(DATABASE_URL)
+
+# Shares the pool with `engine`, but connections run in AUTOCOMMIT mode,
+# so read-only requests don't pay for BEGIN/COMMIT round-trips.
+read_only_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+replica_engines = [_create_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+_read_only_replica_engines = [
+    replica.execution_options(isolation_level="AUTOCOMMIT")
+    for replica in replica_engines
+]
+
+# principal id -> monotonic deadline of its read-your-writes window
+_recent_writes: dict[int, float] = {}
+
+
+def mark_recent_write(principal_id: int) -> None:
+    now = time.monotonic()
+    # Every window is as long, so moving a principal to the end keeps the
+    # map ordered by deadline and the expired entries at its front
+    _recent_writes.pop(principal_id, None)
+    while _recent_writes:
+        oldest_id, deadline = next(iter(_recent_writes.items()))
+        if deadline >= now:
+            break
+        del _recent_writes[oldest_id]
+    _recent_writes[principal_id] = now + settings.READ_YOUR_WRITES_SECONDS
+
+
+def has_recent_write(principal_id: int | None) -> bool:
+    if principal_id is None:
+        return False
+    deadline = _recent_writes.get(principal_id)
+    if deadline is None:
+        return False
+    if deadline < time.monotonic():
+        del _recent_writes[principal_id]
+        return False
+    return True
+
+
+def set_session_principal(session: AsyncSession, principal_id: int | None) -> None:
+    session.info["principal_id"] = principal_id
+
+
+def get_read_engine(
+    principal_id: int | None = None, *, autocommit: bool = True
+) -> AsyncEngine:
+    """
+    Pick an engine for a read-only unit of work outside of a session.
+
+    Pass `autocommit=False` when the work needs a transaction, e.g. server
+    side cursors on asyncpg.
+    """
+    if replica_engines and not has_recent_write(principal_id):
+        index = random.randrange(len(replica_engines))
+        if autocommit:
+            return _read_only_replica_engines[index]
+        return replica_engines[index]
+    return read_only_engine if autocommit else engine
+
+
+class RoutingSession(Session):
+    """
+    Sends read-only sessions to a replica and everything else to the primary.
+
+    A read-only session stays on the primary while its principal is inside
+    the read-your-writes window, so users always see their own changes.
+    The engine is chosen once per session to keep it on one connection.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw) -> Engine:
+        if not self.info.get("read_only"):
+            return engine.sync_engine
+        if "bind" not in self.info:
+            principal_id = self.info.get("principal_id")
+            self.info["bind"] = get_read_engine(principal_id).sync_engine
+        return self.info["bind"]
+
+
+SessionLocal = sessionmaker(
+    engine,
+    expire_on_commit=False,
     future=True,
-    echo=settings.ECHO_SQL,
-    pool_size=10,
-    max_overflow=20,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
 )
-SessionLocal = sessionmaker(
-    engine, expire_on_commit=False, future=True, class_=AsyncSession
+ReadOnlySessionLocal = sessionmaker(
+    read_only_engine,
+    expire_on_commit=False,
+    future=True,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    info={"read_only": True},
 )
 
 
+def primary_read_session() -> AsyncSession:
+    """
+    Read-only session pinned to the primary. Used to refill shared caches,
+    which would otherwise keep a lagging replica's rows for their whole TTL.
+    """
+    return ReadOnlySessionLocal(info={"bind": read_only_engine.sync_engine})
+
+
+@event.listens_for(Session, "before_flush")
+def _forbid_read_only_flush(session: Session, *_args) -> None:
+    if session.info.get("read_only") and (
+        session.new or session.dirty or session.deleted
+    ):
+        raise InvalidRequestError("Attempted to write through a read-only session")
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, _flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_dml(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _start_read_your_writes_window(session: Session) -> None:
+    principal_id = session.info.get("principal_id")
+    if session.info.pop("has_writes", False) and principal_id is not None:
+        mark_recent_write(principal_id)
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """
+    Run `callback` once the request transaction of `session` has committed.
+
+    Used to invalidate in-memory state only after the change is visible to
+    other sessions; callbacks are dropped if the transaction rolls back.
+    """
+    session.info.setdefault("on_commit", []).append(callback)
+
+
+async def run_on_commit_callbacks(session: AsyncSession) -> None:
+    for callback in session.info.pop("on_commit", []):
+        await callback()
+
+
 async def get_session() -> AsyncIterator[sessionmaker]:
     try:
         yield SessionLocal
     except SQLAlchemyError as e:
         logger.exception(e)
+
+
+async def get_read_only_session() -> AsyncIterator[sessionmaker]:
+    try:
+        yield ReadOnlySessionLocal
+    except SQLAlchemyError as e:
+        logger.exception(e)
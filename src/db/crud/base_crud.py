@@ -3,19 +3,22 @@ from typing import Any, Generic, Sequence, Type, TypeVar
 
 from fastapi.encoders import jsonable_encoder
 from fastapi_pagination import Page, Params
-from fastapi_pagination.ext.async_sqlalchemy import paginate
 from pydantic import BaseModel
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql.expression import Select
 
 from db.models.base import Base
 from db.models.user import User
-from schemas.common_schema import IOrderEnum
+from schemas.common_schema import ICountModeEnum, IOrderEnum
+from services.pagination_ext import paginate_func
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
 
 
 class BaseCrud(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
@@ -67,10 +70,13 @@ class BaseCrud(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         *,
         params: Params | None = Params(),
         query: Select | None = None,
+        count_mode: ICountModeEnum = ICountModeEnum.exact,
     ) -> Page[ModelType] | None:
         if query is None:
             query = select(self.model)  # type: ignore
-        return await paginate(self.db, query, params)  # type: ignore
+        return await paginate_func(
+            self.db, query, params, count_mode=count_mode  # type: ignore
+        )
 
     async def get_multi_paginated_ordered(
         self,
@@ -78,6 +84,7 @@ class BaseCrud(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         params: Params | None = Params(),
         order_by: Any | None = None,
         order: IOrderEnum | None = IOrderEnum.ascendent,
+        count_mode: ICountModeEnum = ICountModeEnum.exact,
     ) -> Page[ModelType] | None:
         columns = self.model.__table__.columns  # type: ignore
 
@@ -89,7 +96,7 @@ class BaseCrud(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         else:
             query = select(self.model).order_by(order_by.desc())  # type: ignore
 
-        return await paginate(self.db, query, params)
+        return await paginate_func(self.db, query, params, count_mode=count_mode)
 
     async def create(self, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
@@ -99,6 +106,31 @@ class BaseCrud(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         await self.db.flush()
         return db_obj
 
+    async def create_many(
+        self, *, objs_in: Sequence[CreateSchemaType | dict[str, Any]]
+    ) -> Sequence[ModelType]:
+        """
+        Insert all rows as one executemany INSERT ... RETURNING, which
+        SQLAlchemy sends as multi-row VALUES batches, and return the created
+        objects in the order of `objs_in`.
+        """
+        if not objs_in:
+            return []
+        values = [
+            obj_in if isinstance(obj_in, dict) else obj_in.dict() for obj_in in objs_in
+        ]
+        if self.db.get_bind().dialect.name == "sqlite":
+            # SQLite has no sentinel to sort RETURNING rows by and would insert
+            # one row at a time; writers are serialized there, so the new ids
+            # follow the parameter order instead
+            query = insert(self.model).returning(self.model)  # type: ignore
+            objs = (await self.db.scalars(query, values)).all()
+            return sorted(objs, key=lambda obj: obj.id)  # type: ignore
+        query = insert(self.model).returning(  # type: ignore
+            self.model, sort_by_parameter_order=True
+        )
+        return (await self.db.scalars(query, values)).all()
+
     async def update(
         self, *, db_obj: ModelType, obj_in: UpdateSchemaType | dict[str, Any]
     ) -> ModelType:
@@ -114,6 +146,28 @@ class BaseCrud(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         await self.db.flush()
         return db_obj
 
+    async def update_many(
+        self, *, ids: Sequence[Any], obj_in: UpdateSchemaType | dict[str, Any]
+    ) -> Sequence[Any]:
+        """
+        Apply the same values to all `ids` with a single UPDATE statement
+        and return the ids of the rows that were updated.
+        """
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if not ids or not update_data:
+            return []
+
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(ids))  # type: ignore
+            .values(**update_data)
+            .returning(self.model.id)  # type: ignore
+        )
+        return (await self.db.scalars(query)).all()
+
     async def delete(self, *, id_: Any) -> ModelType | None:
         obj = await self.get(id_)
         if not obj:
@@ -123,6 +177,21 @@ class BaseCrud(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         await self.db.flush()
         return obj
 
+    async def delete_many(self, *, ids: Sequence[Any]) -> Sequence[Any]:
+        """
+        Delete all `ids` with a single DELETE statement and return the ids
+        of the rows that were deleted.
+        """
+        if not ids:
+            return []
+
+        query = (
+            delete(self.model)
+            .where(self.model.id.in_(ids))  # type: ignore
+            .returning(self.model.id)  # type: ignore
+        )
+        return (await self.db.scalars(query)).all()
+
 
 def format_datetime(obj_in_data: dict) -> dict:
     if "created_at" in obj_in_data.keys():
@@ -130,3 +199,48 @@ def format_datetime(obj_in_data: dict) -> dict:
             obj_in_data["created_at"], "%Y-%m-%dT%H:%M:%S.%f"
         )
     return obj_in_data
+
+
+def construct_schema(schema: Type[SchemaType], **values: Any) -> SchemaType:
+    """
+    Build `schema` from values read straight from the database. They already
+    match the columns the schema mirrors, so pydantic validation is skipped,
+    which is most of the cost of serializing large pages.
+    """
+    return schema.construct(**values)
+
+
+async def upsert_rows(
+    db: AsyncSession,
+    model: Type[Base],
+    rows: Sequence[dict[str, Any]],
+    *,
+    index_elements: Sequence[str],
+    fields: Sequence[str],
+    increment: bool,
+    batch_size: int | None = None,
+) -> None:
+    """
+    INSERT `rows`, updating `fields` of the rows that conflict on
+    `index_elements`: they are added to the stored values with `increment`,
+    and overwrite them otherwise. Rows are sent `batch_size` at a time.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    insert_ = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    batch_size = batch_size or len(rows)
+    for start in range(0, len(rows), batch_size):
+        query = insert_(model).values(list(rows[start:start + batch_size]))
+        query = query.on_conflict_do_update(
+            index_elements=[getattr(model, name) for name in index_elements],
+            set_={
+                field: (
+                    getattr(model, field) + getattr(query.excluded, field)
+                    if increment
+                    else getattr(query.excluded, field)
+                )
+                for field in fields
+            },
+        )
+        await db.execute(query)
@@ -0,0 +1,179 @@
+from datetime import date, timedelta
+from typing import Mapping
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.crud.base_crud import upsert_rows
+from db.models.content_rollup import ContentKindsEnum, ContentRollup
+from db.models.exercise import Exercise
+from db.models.post import Post
+from db.models.user import User
+from schemas.common_schema import IPeriodEnum
+
+# (kind, day, owner) of a content_rollups row
+RollupKey = tuple[ContentKindsEnum, date, int]
+
+ROLLUP_SOURCES = {
+    ContentKindsEnum.POST: Post,
+    ContentKindsEnum.EXERCISE: Exercise,
+}
+
+
+def period_start(day: date, period: IPeriodEnum) -> date:
+    if period == IPeriodEnum.week:
+        return day - timedelta(days=day.weekday())
+    if period == IPeriodEnum.month:
+        return day.replace(day=1)
+    return day
+
+
+def _next_period_start(start: date, period: IPeriodEnum) -> date:
+    if period == IPeriodEnum.week:
+        return start + timedelta(weeks=1)
+    if period == IPeriodEnum.month:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+class ContentRollupCrud:
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def apply(self, deltas: Mapping[RollupKey, int]) -> None:
+        """
+        Add `deltas` to the daily rollups with one upsert, in the caller's
+        transaction, in key order so concurrent writers lock rows alike.
+        """
+        rows = [
+            {"kind": kind, "day": day, "owner": owner, "count": delta}
+            for (kind, day, owner), delta in sorted(deltas.items())
+            if delta
+        ]
+        if rows:
+            await self._upsert(rows, increment=True)
+
+    async def get_by_period(
+        self,
+        kind: ContentKindsEnum,
+        period: IPeriodEnum,
+        date_from: date,
+        date_to: date,
+    ) -> list[tuple[date, int]]:
+        """
+        Counts per day/week/month between the two dates, empty periods
+        included. Days are summed in SQL, at most a row per day of the
+        range is read, and grouped into weeks or months here.
+        """
+        query = (
+            select(ContentRollup.day, func.sum(ContentRollup.count))
+            .where(
+                ContentRollup.kind == kind,
+                ContentRollup.day.between(date_from, date_to),
+            )
+            .group_by(ContentRollup.day)
+        )
+        counts: dict[date, int] = {}
+        for day, count in await self.db.execute(query):
+            start = period_start(day, period)
+            counts[start] = counts.get(start, 0) + count
+
+        chunks = []
+        start = period_start(date_from, period)
+        while start <= date_to:
+            chunks.append((start, counts.get(start, 0)))
+            start = _next_period_start(start, period)
+        return chunks
+
+    async def get_days(self, kind: ContentKindsEnum, owner: int) -> list[date]:
+        """
+        Days with content of `owner`, oldest first.
+        """
+        query = (
+            select(ContentRollup.day)
+            .where(
+                ContentRollup.kind == kind,
+                ContentRollup.owner == owner,
+                ContentRollup.count > 0,
+            )
+            .order_by(ContentRollup.day)
+        )
+        return list((await self.db.scalars(query)).all())
+
+    async def get_by_author(
+        self,
+        kind: ContentKindsEnum,
+        date_from: date,
+        date_to: date,
+        limit: int,
+    ) -> list[tuple[str, int]]:
+        total = func.sum(ContentRollup.count).label("total")
+        query = (
+            select(User.name, total)
+            .join(User, User.id == ContentRollup.owner)
+            .where(
+                ContentRollup.kind == kind,
+                ContentRollup.day.between(date_from, date_to),
+            )
+            .group_by(User.id, User.name)
+            .having(total > 0)
+            .order_by(total.desc(), User.name)
+            .limit(limit)
+        )
+        return [(name, count) for name, count in await self.db.execute(query)]
+
+    async def reconcile(self, fix: bool = True, batch_size: int = 1000) -> int:
+        """
+        Recount the rollups from the source tables and return how many
+        rows drifted. With `fix` they are overwritten, and rows without
+        content left, including the zero rows deletes leave behind, are
+        compacted away.
+        """
+        expected: dict[RollupKey, int] = {}
+        for kind, model in ROLLUP_SOURCES.items():
+            day = func.date(model.time)
+            query = select(day, model.owner, func.count()).group_by(day, model.owner)
+            for raw_day, owner, count in await self.db.execute(query):
+                # SQLite returns date() as text
+                if isinstance(raw_day, str):
+                    raw_day = date.fromisoformat(raw_day)
+                expected[(kind, raw_day, owner)] = count
+
+        stored = {
+            (rollup.kind, rollup.day, rollup.owner): rollup.count
+            for rollup in (await self.db.execute(select(ContentRollup))).scalars()
+        }
+        changed = [
+            key for key, count in expected.items() if stored.get(key) != count
+        ]
+        stale = [key for key in stored if key not in expected]
+
+        if fix:
+            rows = [
+                {"kind": kind, "day": day, "owner": owner, "count": expected[key]}
+                for key in changed
+                for kind, day, owner in (key,)
+            ]
+            await self._upsert(rows, increment=False, batch_size=batch_size)
+            for kind, day, owner in stale:
+                await self.db.execute(
+                    delete(ContentRollup).where(
+                        ContentRollup.kind == kind,
+                        ContentRollup.day == day,
+                        ContentRollup.owner == owner,
+                    )
+                )
+        return len(changed) + sum(1 for key in stale if stored[key])
+
+    async def _upsert(
+        self, rows: list[dict], increment: bool, batch_size: int | None = None
+    ) -> None:
+        await upsert_rows(
+            self.db,
+            ContentRollup,
+            rows,
+            index_elements=["kind", "day", "owner"],
+            fields=["count"],
+            increment=increment,
+            batch_size=batch_size,
+        )
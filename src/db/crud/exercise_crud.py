@@ -1,18 +1,55 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from typing import Any, Sequence
 
-from sqlalchemy import select, desc
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Select, select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.crud.base_crud import BaseCrud
+from db.config import on_commit, primary_read_session
+from db.crud.base_crud import BaseCrud, construct_schema
+from db.crud.content_rollup_crud import ContentRollupCrud
+from db.crud.user_counters_crud import CounterDeltas, UserCountersCrud
+from db.models.content_rollup import ContentKindsEnum
 from db.models.exercise import Exercise
+from db.models.user_counters import UserCounters
 from db.models.user import User, UserTypesEnum
 from db.schemas.exercise_schema import (
     ExerciseCreate,
     ExerciseUpdate,
     ExerciseReadResponse,
+    ExerciseStats,
 )
+from schemas.common_schema import CursorPage, CursorParams
+from services.cache import cache
+from services.etag import make_etag
+from services.keyset_pagination import paginate_keyset
 from settings import settings
 
+DAILY_EXERCISE_CACHE_KEY = "daily_exercise"
+
+
+async def invalidate_daily_exercise() -> None:
+    await cache.delete(DAILY_EXERCISE_CACHE_KEY)
+
+
+def practice_streaks(days: Sequence[date], today: date) -> tuple[int, int]:
+    """
+    Current and longest run of consecutive `days` (sorted, unique). The
+    current streak is still alive when the last practice was yesterday;
+    days after `today` are ignored.
+    """
+    current = longest = 0
+    previous = None
+    for day in days:
+        if day > today:
+            break
+        current = current + 1 if previous == day - timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    if previous is None or previous < today - timedelta(days=1):
+        current = 0
+    return current, longest
+
 
 class ExerciseCrud(BaseCrud[Exercise, ExerciseCreate, ExerciseUpdate]):
     def __init__(self, db_session: AsyncSession):
@@ -28,37 +65,238 @@ class ExerciseCrud(BaseCrud[Exercise, ExerciseCreate, ExerciseUpdate]):
             text=exercise_in.text,
             photo=exercise_in.photo,
             time=exercise_in.time,
+            duration=exercise_in.duration,
             owner=current_user.id,
         )
         self.db.add(db_exercise)
         await self.db.flush()
 
+        deltas = CounterDeltas()
+        deltas.add_exercise(
+            current_user.id, db_exercise.duration, day=db_exercise.time.date()
+        )
+        await UserCountersCrud(self.db).apply(deltas)
+
+        if current_user.user_type == UserTypesEnum.ADMIN:
+            on_commit(self.db, invalidate_daily_exercise)
+        return db_exercise
+
+    async def create_exercises(
+        self,
+        exercises_in: list[ExerciseCreate],
+        current_user: User,
+    ) -> list[Exercise]:
+        db_exercises = await self.create_many(
+            objs_in=[
+                {**exercise_in.dict(), "owner": current_user.id}
+                for exercise_in in exercises_in
+            ]
+        )
+
+        deltas = CounterDeltas()
+        for db_exercise in db_exercises:
+            deltas.add_exercise(
+                db_exercise.owner, db_exercise.duration, day=db_exercise.time.date()
+            )
+        await UserCountersCrud(self.db).apply(deltas)
+
+        if current_user.user_type == UserTypesEnum.ADMIN:
+            on_commit(self.db, invalidate_daily_exercise)
+        return list(db_exercises)
+
+    async def update_exercise_info(
+        self,
+        db_exercise: Exercise,
+        exercise_in: ExerciseUpdate,
+    ) -> Exercise:
+        exercise = await self.update(db_obj=db_exercise, obj_in=exercise_in)
+        # Only admin exercises can be the daily one; the owner is usually the
+        # current user and already in the identity map
+        owner = await self.db.get(User, exercise.owner)
+        if owner and owner.user_type == UserTypesEnum.ADMIN:
+            on_commit(self.db, invalidate_daily_exercise)
+        return exercise
+
+    async def update(
+        self, *, db_obj: Exercise, obj_in: ExerciseUpdate | dict[str, Any]
+    ) -> Exercise:
+        old_duration, old_day = db_obj.duration, db_obj.time.date()
+        db_exercise = await super().update(db_obj=db_obj, obj_in=obj_in)
+
+        new_day = db_exercise.time.date()
+        if db_exercise.duration != old_duration or new_day != old_day:
+            deltas = CounterDeltas()
+            deltas.add_exercise(db_exercise.owner, old_duration, -1, day=old_day)
+            deltas.add_exercise(db_exercise.owner, db_exercise.duration, day=new_day)
+            await UserCountersCrud(self.db).apply(deltas)
         return db_exercise
 
+    async def update_many(
+        self, *, ids: Sequence[int], obj_in: ExerciseUpdate | dict[str, Any]
+    ) -> Sequence[int]:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if "duration" not in update_data and "time" not in update_data:
+            return await super().update_many(ids=ids, obj_in=update_data)
+
+        before = await self._lock_owners_and_durations(ids)
+        updated_ids = await super().update_many(ids=ids, obj_in=update_data)
+        deltas = CounterDeltas()
+        for exercise_id in updated_ids:
+            owner, old_duration, old_time = before[exercise_id]
+            new_duration = update_data.get("duration", old_duration)
+            new_time = update_data.get("time", old_time)
+            deltas.add_exercise(owner, old_duration, -1, day=old_time.date())
+            deltas.add_exercise(owner, new_duration, day=new_time.date())
+        await UserCountersCrud(self.db).apply(deltas)
+        return updated_ids
+
+    async def delete(self, *, id_: int) -> Exercise | None:
+        db_exercise = await super().delete(id_=id_)
+
+        if db_exercise:
+            deltas = CounterDeltas()
+            deltas.add_exercise(
+                db_exercise.owner, db_exercise.duration, -1, day=db_exercise.time.date()
+            )
+            await UserCountersCrud(self.db).apply(deltas)
+        return db_exercise
+
+    async def delete_many(self, *, ids: Sequence[int]) -> Sequence[int]:
+        before = await self._lock_owners_and_durations(ids)
+        deleted_ids = await super().delete_many(ids=ids)
+
+        deltas = CounterDeltas()
+        for exercise_id in deleted_ids:
+            owner, old_duration, old_time = before[exercise_id]
+            deltas.add_exercise(owner, old_duration, -1, day=old_time.date())
+        await UserCountersCrud(self.db).apply(deltas)
+        return deleted_ids
+
+    async def _lock_owners_and_durations(
+        self, ids: Sequence[int]
+    ) -> dict[int, tuple[int, int | None, datetime]]:
+        # Locking keeps the old values valid until the counters are updated
+        if not ids:
+            return {}
+        query = (
+            select(Exercise.id, Exercise.owner, Exercise.duration, Exercise.time)
+            .where(Exercise.id.in_(ids))
+            .with_for_update()
+        )
+        rows = (await self.db.execute(query)).all()
+        return {row.id: (row.owner, row.duration, row.time) for row in rows}
+
+    async def get_exercise_stats(self, owner: int) -> ExerciseStats:
+        """
+        Streaks come from the owner's daily rollups and totals from the user
+        counters, so the cost depends on the days practiced, not on the
+        number of exercises.
+        """
+        days = await ContentRollupCrud(self.db).get_days(
+            ContentKindsEnum.EXERCISE, owner
+        )
+        counters = await self.db.get(UserCounters, owner)
+        total_sessions = counters.exercises if counters else 0
+        total_seconds = counters.meditation_seconds if counters else 0
+
+        today = datetime.utcnow().date()
+        current_streak, longest_streak = practice_streaks(days, today)
+        weeks = max((today - days[0]).days // 7 + 1, 1) if days else 1
+        return ExerciseStats(
+            current_streak=current_streak,
+            longest_streak=longest_streak,
+            sessions_per_week=round(total_sessions / weeks, 2),
+            total_sessions=total_sessions,
+            total_seconds=total_seconds,
+        )
+
     async def get_exercises_by_owner(
         self,
         owner: int,
-    ) -> list[ExerciseReadResponse]:
-        query = (
-            select(self.model)
-            .where(
-                self.model.owner == owner,  # type: ignore
-            )
-            .order_by(desc(self.model.time))
+        params: CursorParams,
+    ) -> CursorPage[ExerciseReadResponse]:
+        query = select(
+            Exercise.id, Exercise.text, Exercise.photo, Exercise.time, Exercise.duration
+        ).where(
+            Exercise.owner == owner,  # type: ignore
+        )
+        rows, next_cursor = await paginate_keyset(
+            self.db,
+            query,
+            keys=(Exercise.time, Exercise.id),
+            params=params,
+        )
+        return CursorPage(
+            items=[
+                construct_schema(
+                    ExerciseReadResponse,
+                    id=exercise.id,
+                    text=exercise.text,
+                    photo=exercise.photo,
+                    time=exercise.time,
+                    duration=exercise.duration,
+                )
+                for exercise in rows
+            ],
+            next_cursor=next_cursor,
         )
 
-        result = (await self.db.execute(query)).fetchall()
-        return [
-            ExerciseReadResponse(
-                id=exercise[0].id,
-                text=exercise[0].text,
-                photo=exercise[0].photo,
-                time=exercise[0].time,
+    @staticmethod
+    def export_query(owner: int) -> Select:
+        return (
+            select(
+                Exercise.id,
+                Exercise.text,
+                Exercise.photo,
+                Exercise.time,
+                Exercise.duration,
+                Exercise.owner,
             )
-            for exercise in result
-        ]
+            .where(Exercise.owner == owner)
+            .order_by(Exercise.id)
+        )
+
+    async def get_exercise_etag(self, exercise_id: int) -> str | None:
+        query = select(Exercise.id, Exercise.updated_at).where(
+            Exercise.id == exercise_id
+        )
+        result = (await self.db.execute(query)).one_or_none()
+        return make_etag("exercise", *result) if result else None
 
     async def get_daily_exercise(self) -> ExerciseReadResponse | None:
+        exercise = (await self._get_cached_daily_exercise())["exercise"]
+        return ExerciseReadResponse(**exercise) if exercise else None
+
+    async def get_daily_exercise_etag(self) -> str:
+        return (await self._get_cached_daily_exercise())["etag"]
+
+    async def _get_cached_daily_exercise(self) -> dict[str, Any]:
+        cached = await cache.get(DAILY_EXERCISE_CACHE_KEY)
+        if cached is not None and "etag" in cached:
+            return cached
+
+        async with primary_read_session() as session:
+            exercise = await self._get_daily_exercise(session)
+        cached = {
+            "exercise": jsonable_encoder(
+                ExerciseReadResponse.from_orm(exercise) if exercise else None
+            ),
+            "etag": make_etag(
+                "daily_exercise",
+                *((exercise.id, exercise.updated_at) if exercise else ()),
+            ),
+        }
+        await cache.set(
+            DAILY_EXERCISE_CACHE_KEY,
+            cached,
+            ttl=settings.DAILY_EXERCISE_CACHE_TTL_SECONDS,
+        )
+        return cached
+
+    async def _get_daily_exercise(self, session: AsyncSession) -> Exercise | None:
         query = (
             select(self.model)
             .join(User, self.model.owner == User.id)  # type: ignore
@@ -67,11 +305,6 @@ class ExerciseCrud(BaseCrud[Exercise, ExerciseCreate, ExerciseUpdate]):
                 User.user_type == UserTypesEnum.ADMIN,
             )
             .order_by(desc(self.model.time))
+            .limit(1)
         )
-        result = (await self.db.execute(query)).first()
-        return ExerciseReadResponse(
-            id=result[0].id,
-            text=result[0].text,
-            photo=result[0].photo,
-            time=result[0].time,
-        ) if result else None
+        return (await session.execute(query)).scalar_one_or_none()
@@ -1,15 +1,56 @@
-from typing import Any
+from datetime import datetime, timedelta
+from typing import Any, Sequence
 
-from sqlalchemy import Select, select, and_, or_
+from fastapi.encoders import jsonable_encoder
+from fastapi_pagination import Page, Params
+from sqlalchemy import (
+    Row,
+    Select,
+    and_,
+    column,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
-from db.crud.base_crud import BaseCrud
-from db.models.post import Post
+from db.config import on_commit, primary_read_session
+from db.crud.base_crud import BaseCrud, construct_schema
+from db.crud.user_counters_crud import CounterDeltas, UserCountersCrud
+from db.models.post import (
+    POST_SEARCH_CONFIG,
+    POST_SEARCH_FTS_TABLE,
+    POST_SEARCH_VECTOR,
+    Post,
+    PostStatusesEnum,
+)
 from db.models.user import User
-from db.schemas.post_schema import PostCreate, PostUpdate, PostAdminCreate, PostFilter, PostReadResponse
+from db.schemas.post_schema import (
+    PostAdminBulkStatusUpdateResult,
+    PostAdminCreate,
+    PostCreate,
+    PostFilter,
+    PostModerationBatch,
+    PostReadResponse,
+    PostUpdate,
+)
 from db.schemas.user_schema import UserRead
-from schemas.common_schema import IOrderEnum
+from schemas.common_schema import CursorPage, CursorParams, ICountModeEnum
+from services.cache import cache
+from services.etag import make_etag
+from services.keyset_pagination import encode_cursor, paginate_keyset
+from services.pagination_ext import paginate_func
+from settings import settings
+
+APPROVED_FEED_CACHE_KEY = "approved_posts_feed"
+
+
+async def invalidate_approved_feed() -> None:
+    await cache.delete(APPROVED_FEED_CACHE_KEY)
 
 
 class PostCrud(BaseCrud[Post, PostCreate, PostUpdate]):
@@ -18,25 +59,19 @@ class PostCrud(BaseCrud[Post, PostCreate, PostUpdate]):
         super().__init__(model=Post, db_session=db_session)
 
     async def get_post(self, post_id: int) -> PostReadResponse | None:
+        query = self._post_read_query().where(Post.id == post_id)
+        result = (await self.db.execute(query)).one_or_none()
+        return _post_read_response(result) if result else None
+
+    async def get_post_etag(self, post_id: int) -> str | None:
         owner = aliased(User, name="owner")
         query = (
-            select(self.model, owner)
-            .join(owner, owner.id == self.model.owner)  # type: ignore
-            .where(self.model.id == post_id)
+            select(Post.id, Post.updated_at, owner.updated_at)
+            .join(owner, owner.id == Post.owner)  # type: ignore
+            .where(Post.id == post_id)
         )
         result = (await self.db.execute(query)).one_or_none()
-        return PostReadResponse(
-            id=result[0].id,
-            title=result[0].title,
-            photo=result[0].photo,
-            description=result[0].description,
-            owner=UserRead(
-                id=result[1].id,
-                name=result[1].name,
-                avatar=result[1].avatar,
-                user_type=result[1].user_type,
-            )
-        ) if result else None
+        return make_etag("post", *result) if result else None
 
     async def create_post(
         self,
@@ -52,6 +87,11 @@ class PostCrud(BaseCrud[Post, PostCreate, PostUpdate]):
         self.db.add(db_post)
         await self.db.flush()
 
+        deltas = CounterDeltas()
+        deltas.add_post(
+            current_user.id, PostStatusesEnum.WAITING, day=db_post.time.date()
+        )
+        await UserCountersCrud(self.db).apply(deltas)
         return db_post
 
     async def create_post_admin(
@@ -64,44 +104,373 @@ class PostCrud(BaseCrud[Post, PostCreate, PostUpdate]):
             description=post_in.description,
             photo=post_in.photo,
             owner=current_user.id,
-            status=post_in.status,
+            status=post_in.status or PostStatusesEnum.WAITING,
         )
         self.db.add(db_post)
         await self.db.flush()
 
+        deltas = CounterDeltas()
+        deltas.add_post(current_user.id, db_post.status, day=db_post.time.date())
+        await UserCountersCrud(self.db).apply(deltas)
+        if post_in.status == PostStatusesEnum.APPROVED:
+            on_commit(self.db, invalidate_approved_feed)
+        return db_post
+
+    async def create_posts_admin(
+        self,
+        posts_in: list[PostAdminCreate],
+        current_user: User,
+    ) -> list[Post]:
+        db_posts = await self.create_many(
+            objs_in=[
+                {
+                    **post_in.dict(),
+                    "owner": current_user.id,
+                    "status": post_in.status or PostStatusesEnum.WAITING,
+                }
+                for post_in in posts_in
+            ]
+        )
+
+        deltas = CounterDeltas()
+        for db_post in db_posts:
+            deltas.add_post(db_post.owner, db_post.status, day=db_post.time.date())
+        await UserCountersCrud(self.db).apply(deltas)
+        if any(post_in.status == PostStatusesEnum.APPROVED for post_in in posts_in):
+            on_commit(self.db, invalidate_approved_feed)
+        return list(db_posts)
+
+    async def update(
+        self, *, db_obj: Post, obj_in: PostUpdate | dict[str, Any]
+    ) -> Post:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if "status" in update_data and update_data["status"] is None:
+            # The admin form always sends a status, leaving it empty keeps it
+            update_data = {
+                key: value for key, value in update_data.items() if key != "status"
+            }
+        if update_data.get("status") not in (None, PostStatusesEnum.WAITING):
+            # A moderated post leaves the moderation queue
+            update_data = {**update_data, "claimed_by": None, "claimed_until": None}
+
+        on_commit(self.db, invalidate_approved_feed)
+        old_status = db_obj.status
+        db_post = await super().update(db_obj=db_obj, obj_in=update_data)
+
+        if db_post.status != old_status:
+            deltas = CounterDeltas()
+            deltas.add_post(db_post.owner, old_status, -1)
+            deltas.add_post(db_post.owner, db_post.status)
+            await UserCountersCrud(self.db).apply(deltas)
         return db_post
 
+    async def update_many(
+        self, *, ids: Sequence[int], obj_in: PostUpdate | dict[str, Any]
+    ) -> Sequence[int]:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+
+        on_commit(self.db, invalidate_approved_feed)
+        if "status" not in update_data:
+            return await super().update_many(ids=ids, obj_in=update_data)
+
+        before = await self._lock_owners_and_statuses(ids)
+        updated_ids = await super().update_many(ids=ids, obj_in=update_data)
+        deltas = CounterDeltas()
+        for post_id in updated_ids:
+            owner, old_status, _ = before[post_id]
+            deltas.add_post(owner, old_status, -1)
+            deltas.add_post(owner, update_data["status"])
+        await UserCountersCrud(self.db).apply(deltas)
+        return updated_ids
+
+    async def delete(self, *, id_: int) -> Post | None:
+        on_commit(self.db, invalidate_approved_feed)
+        db_post = await super().delete(id_=id_)
+
+        if db_post:
+            deltas = CounterDeltas()
+            deltas.add_post(
+                db_post.owner, db_post.status, -1, day=db_post.time.date()
+            )
+            await UserCountersCrud(self.db).apply(deltas)
+        return db_post
+
+    async def delete_many(self, *, ids: Sequence[int]) -> Sequence[int]:
+        on_commit(self.db, invalidate_approved_feed)
+        before = await self._lock_owners_and_statuses(ids)
+        deleted_ids = await super().delete_many(ids=ids)
+
+        deltas = CounterDeltas()
+        for post_id in deleted_ids:
+            owner, old_status, old_time = before[post_id]
+            deltas.add_post(owner, old_status, -1, day=old_time.date())
+        await UserCountersCrud(self.db).apply(deltas)
+        return deleted_ids
+
+    async def _lock_owners_and_statuses(
+        self, ids: Sequence[int]
+    ) -> dict[int, tuple[int, PostStatusesEnum, datetime]]:
+        # Locking keeps the old values valid until the counters are updated
+        if not ids:
+            return {}
+        query = (
+            select(Post.id, Post.owner, Post.status, Post.time)
+            .where(Post.id.in_(ids))
+            .with_for_update()
+        )
+        rows = (await self.db.execute(query)).all()
+        return {row.id: (row.owner, row.status, row.time) for row in rows}
+
+    async def update_posts_status(
+        self,
+        post_ids: list[int],
+        status: PostStatusesEnum,
+    ) -> PostAdminBulkStatusUpdateResult:
+        values: dict[str, Any] = {"status": status}
+        if status != PostStatusesEnum.WAITING:
+            values.update(claimed_by=None, claimed_until=None)
+        updated_ids = await self.update_many(ids=post_ids, obj_in=values)
+        updated = set(updated_ids)
+        return PostAdminBulkStatusUpdateResult(
+            updated_ids=sorted(updated),
+            not_found_ids=sorted(set(post_ids) - updated),
+        )
+
+    async def claim_waiting_posts(
+        self,
+        current_user: User,
+        limit: int,
+    ) -> PostModerationBatch:
+        """
+        Lease up to `limit` of the oldest WAITING posts to `current_user`.
+
+        Posts whose lease expired are claimable again. On PostgreSQL the
+        candidates are locked with FOR UPDATE SKIP LOCKED, so concurrent
+        moderators skip each other's rows instead of waiting on them or
+        claiming them twice. The ids are selected first and updated by value:
+        as an IN subquery the planner may run the LIMIT/SKIP LOCKED select
+        more than once and claim more or other rows. SQLite ignores the
+        locking clause, there the UPDATE checks the lease again instead.
+        """
+        now = datetime.utcnow()
+        claimed_until = now + timedelta(seconds=settings.MODERATION_LEASE_SECONDS)
+        claimable = and_(
+            Post.status == PostStatusesEnum.WAITING,
+            or_(Post.claimed_until.is_(None), Post.claimed_until < now),
+        )
+        candidate_ids = (
+            await self.db.scalars(
+                select(Post.id)
+                .where(claimable)
+                .order_by(Post.time, Post.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        claimed_ids = []
+        if candidate_ids:
+            query = (
+                update(Post)
+                .where(Post.id.in_(candidate_ids), claimable)
+                # A lease doesn't change the post, so its ETag is kept
+                .values(
+                    claimed_by=current_user.id,
+                    claimed_until=claimed_until,
+                    updated_at=Post.updated_at,
+                )
+                .returning(Post.id)
+            )
+            claimed_ids = (await self.db.scalars(query)).all()
+
+        rows = []
+        if claimed_ids:
+            rows = (
+                await self.db.execute(
+                    self._post_read_query()
+                    .where(Post.id.in_(claimed_ids))
+                    .order_by(Post.time, Post.id)
+                )
+            ).all()
+        return PostModerationBatch(
+            claimed_until=claimed_until,
+            items=[_post_read_response(row) for row in rows],
+        )
+
     async def get_all_posts_ordered(
         self,
         posts_filter: PostFilter,
-        order_by: Any = None,
-    ) -> list[PostReadResponse] | None:
-        query = await self._get_all_posts_query(
-            posts_filter=posts_filter,
-            order_by=order_by,
-            order=IOrderEnum.descendent,
-        )
-        db_result = (await self.db.execute(query)).fetchall()
-        return [
-            PostReadResponse(
-                id=row[0].id,
-                title=row[0].title,
-                photo=row[0].photo,
-                description=row[0].description,
-                owner=UserRead(**row[1])
-            ) for row in db_result
-        ] if db_result else None
+        params: CursorParams,
+    ) -> CursorPage[PostReadResponse]:
+        query = self._get_all_posts_query(posts_filter=posts_filter)
+        rows, next_cursor = await paginate_keyset(
+            self.db,
+            query,
+            keys=(Post.time, Post.id),
+            params=params,
+        )
+        return CursorPage(
+            items=[_post_read_response(row) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def get_approved_feed(
+        self,
+        params: CursorParams,
+    ) -> CursorPage[PostReadResponse]:
+        """
+        Approved posts, newest first.
+
+        The newest FEED_CACHED_ITEMS posts are kept in the application cache
+        along with the cursor of each one, so the first pages are served
+        without a query. Cursors pointing past the cached window, or that
+        are no longer in it, continue from the database.
+        """
+        feed = await self._get_cached_approved_feed()
+        start = 0
+        if params.cursor:
+            try:
+                start = feed["cursors"].index(params.cursor) + 1
+            except ValueError:
+                start = None
+        if start is not None:
+            end = start + params.limit
+            cached_count = len(feed["items"])
+            if end <= cached_count or feed["complete"]:
+                has_more = end < cached_count or not feed["complete"]
+                # Cached items are validated response dicts already
+                return CursorPage.construct(
+                    items=feed["items"][start:end],
+                    next_cursor=(
+                        feed["cursors"][min(end, cached_count) - 1]
+                        if has_more
+                        else None
+                    ),
+                )
+
+        rows, next_cursor = await paginate_keyset(
+            self.db,
+            self._approved_feed_query(),
+            keys=(Post.time, Post.id),
+            params=params,
+        )
+        return CursorPage(
+            items=[_post_read_response(row) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def _get_cached_approved_feed(self) -> dict[str, Any]:
+        cached = await cache.get(APPROVED_FEED_CACHE_KEY)
+        if cached is not None:
+            return cached
+
+        async with primary_read_session() as session:
+            rows, next_cursor = await paginate_keyset(
+                session,
+                self._approved_feed_query(),
+                keys=(Post.time, Post.id),
+                params=CursorParams.construct(
+                    cursor=None, limit=settings.FEED_CACHED_ITEMS
+                ),
+            )
+        cached = {
+            "items": jsonable_encoder([_post_read_response(row) for row in rows]),
+            "cursors": [encode_cursor((row.time, row.id)) for row in rows],
+            "complete": next_cursor is None,
+        }
+        await cache.set(
+            APPROVED_FEED_CACHE_KEY,
+            cached,
+            ttl=settings.FEED_CACHE_TTL_SECONDS,
+        )
+        return cached
+
+    async def search_posts(
+        self,
+        search: str,
+        params: Params,
+    ) -> Page[PostReadResponse]:
+        query = self._post_read_query()
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            document = literal_column(f"posts.{POST_SEARCH_VECTOR}")
+            ts_query = func.websearch_to_tsquery(
+                literal_column(f"'{POST_SEARCH_CONFIG}'"), search
+            )
+            query = query.where(document.op("@@")(ts_query)).order_by(
+                func.ts_rank_cd(document, ts_query).desc(), Post.id.desc()
+            )
+        else:
+            fts = table(POST_SEARCH_FTS_TABLE, column("rowid"), column("rank"))
+            matches = (
+                select(fts.c.rowid, fts.c.rank)
+                .where(
+                    literal_column(POST_SEARCH_FTS_TABLE).op("MATCH")(
+                        _fts5_query(search)
+                    )
+                )
+                .subquery()
+            )
+            # FTS5 `rank` is bm25(), lower means a better match
+            query = query.join(matches, matches.c.rowid == Post.id).order_by(
+                matches.c.rank, Post.id.desc()
+            )
+
+        return await paginate_func(
+            self.db,
+            query,
+            params,
+            count_mode=ICountModeEnum.window,
+            scalars=False,
+            transformer=lambda rows: [_post_read_response(row) for row in rows],
+        )
+
+    @staticmethod
+    def export_query() -> Select:
+        return select(
+            Post.id,
+            Post.title,
+            Post.description,
+            Post.time,
+            Post.photo,
+            Post.owner,
+            Post.status,
+        ).order_by(Post.id)
 
     @staticmethod
-    async def _get_all_posts_query(
-            posts_filter: PostFilter,
-            order_by: Any,
-            order: IOrderEnum | None = None,
-    ) -> Select:
+    def _post_read_query() -> Select:
+        """
+        Select only the columns of `PostReadResponse` and its owner, plus
+        `time` for keyset pagination, instead of hydrating `Post` and `User`
+        entities (the latter would also load `password_hash`).
+        """
         owner = aliased(User, name="owner")
-        query = (
-            select(Post, owner)
-            .join(User, User.id == Post.owner)  # type: ignore
+        return select(
+            Post.id,
+            Post.title,
+            Post.photo,
+            Post.description,
+            Post.time,
+            owner.id.label("owner_id"),
+            owner.name.label("owner_name"),
+            owner.avatar.label("owner_avatar"),
+            owner.user_type.label("owner_user_type"),
+        ).join(owner, owner.id == Post.owner)  # type: ignore
+
+    @classmethod
+    def _approved_feed_query(cls) -> Select:
+        # Served by ix_posts_status_time
+        return cls._post_read_query().where(Post.status == PostStatusesEnum.APPROVED)
+
+    @classmethod
+    def _get_all_posts_query(cls, posts_filter: PostFilter) -> Select:
+        return (
+            cls._post_read_query()
             .where(
                 and_(
                     or_(not posts_filter.owner, Post.owner == posts_filter.owner),
@@ -110,9 +479,26 @@ class PostCrud(BaseCrud[Post, PostCreate, PostUpdate]):
             )
         )
 
-        if order == IOrderEnum.ascendent:
-            query = query.order_by(order_by.asc())
-        else:
-            query = query.order_by(order_by.desc())  # type: ignore
 
-        return query
+def _post_read_response(row: Row) -> PostReadResponse:
+    return construct_schema(
+        PostReadResponse,
+        id=row.id,
+        title=row.title,
+        photo=row.photo,
+        description=row.description,
+        owner=construct_schema(
+            UserRead,
+            id=row.owner_id,
+            name=row.owner_name,
+            avatar=row.owner_avatar,
+            user_type=row.owner_user_type,
+        ),
+    )
+
+
+def _fts5_query(search: str) -> str:
+    # Quote every term so user input can't inject FTS5 query syntax
+    return " ".join(
+        '"' + term.replace('"', '""') + '"' for term in search.split()
+    )
@@ -0,0 +1,164 @@
+from collections import Counter, defaultdict
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.crud.base_crud import upsert_rows
+from db.crud.content_rollup_crud import ContentRollupCrud, RollupKey
+from db.models.content_rollup import ContentKindsEnum
+from db.models.exercise import Exercise
+from db.models.post import Post, PostStatusesEnum
+from db.models.user_counters import UserCounters
+
+POST_STATUS_COUNTERS = {
+    PostStatusesEnum.WAITING: "posts_waiting",
+    PostStatusesEnum.APPROVED: "posts_approved",
+    PostStatusesEnum.REJECTED: "posts_rejected",
+}
+COUNTER_FIELDS = (
+    "posts_waiting",
+    "posts_approved",
+    "posts_rejected",
+    "exercises",
+    "meditation_seconds",
+)
+
+
+class CounterDeltas(defaultdict):
+    """
+    Changes to apply to `user_counters`, user id -> counter name -> delta,
+    and to the daily `content_rollups` of the days passed along.
+    """
+
+    def __init__(self):
+        super().__init__(Counter)
+        self.rollups: Counter[RollupKey] = Counter()
+
+    def add_post(
+        self,
+        owner: int,
+        status: PostStatusesEnum | None,
+        step: int = 1,
+        day: date | None = None,
+    ) -> None:
+        field = POST_STATUS_COUNTERS.get(status)
+        if field:
+            self[owner][field] += step
+        if day is not None:
+            self.rollups[(ContentKindsEnum.POST, day, owner)] += step
+
+    def add_exercise(
+        self,
+        owner: int,
+        duration: int | None,
+        step: int = 1,
+        day: date | None = None,
+    ) -> None:
+        self[owner]["exercises"] += step
+        self[owner]["meditation_seconds"] += step * (duration or 0)
+        if day is not None:
+            self.rollups[(ContentKindsEnum.EXERCISE, day, owner)] += step
+
+
+class UserCountersCrud:
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def apply(self, deltas: CounterDeltas) -> None:
+        """
+        Add `deltas` to the counters with one upsert, in the caller's
+        transaction, then to the rollups. Rows are written in user id order
+        so concurrent writers always lock them in the same order.
+        """
+        rows = [
+            {"user_id": user_id, **{field: delta[field] for field in COUNTER_FIELDS}}
+            for user_id, delta in sorted(deltas.items())
+            if any(delta.values())
+        ]
+        if rows:
+            await self._upsert(rows, increment=True)
+        await ContentRollupCrud(self.db).apply(deltas.rollups)
+
+    async def get_all(self) -> dict[int, dict[str, int]]:
+        result = await self.db.execute(select(UserCounters))
+        return {
+            counters.user_id: {field: getattr(counters, field) for field in COUNTER_FIELDS}
+            for counters in result.scalars()
+        }
+
+    async def compute_all(self) -> dict[int, dict[str, int]]:
+        """
+        Count every user's content from the source tables.
+        """
+        expected: dict[int, dict[str, int]] = defaultdict(
+            lambda: dict.fromkeys(COUNTER_FIELDS, 0)
+        )
+        posts = await self.db.execute(
+            select(Post.owner, Post.status, func.count()).group_by(
+                Post.owner, Post.status
+            )
+        )
+        for owner, status, count in posts:
+            field = POST_STATUS_COUNTERS.get(status)
+            if field:
+                expected[owner][field] = count
+
+        exercises = await self.db.execute(
+            select(
+                Exercise.owner,
+                func.count(),
+                func.coalesce(func.sum(Exercise.duration), 0),
+            ).group_by(Exercise.owner)
+        )
+        for owner, count, seconds in exercises:
+            expected[owner]["exercises"] = count
+            expected[owner]["meditation_seconds"] = seconds
+        return dict(expected)
+
+    async def reconcile(
+        self, fix: bool = True, batch_size: int = 1000
+    ) -> dict[int, dict[str, tuple[int, int]]]:
+        """
+        Recompute all counters and return the drift, user id -> counter ->
+        (stored, actual). With `fix` the drifted rows are overwritten.
+        """
+        zero = dict.fromkeys(COUNTER_FIELDS, 0)
+        expected = await self.compute_all()
+        stored = await self.get_all()
+
+        drift = {}
+        for user_id in sorted(expected.keys() | stored.keys()):
+            actual = expected.get(user_id, zero)
+            current = stored.get(user_id, zero)
+            changed = {
+                field: (current[field], actual[field])
+                for field in COUNTER_FIELDS
+                if current[field] != actual[field]
+            }
+            if changed:
+                drift[user_id] = changed
+
+        if fix:
+            rows = [
+                {"user_id": user_id, **expected.get(user_id, zero)}
+                for user_id in drift
+            ]
+            await self._upsert(rows, increment=False, batch_size=batch_size)
+        return drift
+
+    async def _upsert(
+        self,
+        rows: list[dict[str, int]],
+        increment: bool,
+        batch_size: int | None = None,
+    ) -> None:
+        await upsert_rows(
+            self.db,
+            UserCounters,
+            rows,
+            index_elements=["user_id"],
+            fields=COUNTER_FIELDS,
+            increment=increment,
+            batch_size=batch_size,
+        )
@@ -1,19 +1,37 @@
 import logging
+from functools import partial
 from typing import Any
 
-from sqlalchemy import and_, or_, Select
+from sqlalchemy import ColumnElement, Select, column, false, or_, table
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from auth.users import get_password_hash, verify_password
-from db.crud.base_crud import BaseCrud
-from db.models.user import User, UserTypesEnum
-from db.schemas.user_schema import UserCreate, UserUpdate, UserFilter, UserReadResponse
-from schemas.common_schema import IOrderEnum
+from auth.principal_cache import principal_cache
+from auth.users import get_password_hash_async, verify_password_async
+from db.config import on_commit
+from db.crud.base_crud import BaseCrud, construct_schema
+from db.crud.post_crud import invalidate_approved_feed
+from db.models.user import USER_NAME_FTS_TABLE, User, UserTypesEnum
+from db.models.user_counters import UserCounters
+from db.schemas.user_schema import (
+    UserCountersRead,
+    UserCreate,
+    UserDetailedResponse,
+    UserFilter,
+    UserReadResponse,
+    UserUpdate,
+)
+from schemas.common_schema import CursorPage, CursorParams
+from services.etag import make_etag
+from services.keyset_pagination import paginate_keyset
 
 logger = logging.Logger(__name__)
 
 
+async def _invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate(user_id)
+
+
 class UserCrud(BaseCrud[User, UserCreate, UserUpdate]):
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
@@ -28,30 +46,61 @@ class UserCrud(BaseCrud[User, UserCreate, UserUpdate]):
 
         return result.scalar_one_or_none()
 
+    async def get_detailed(self, id_: int) -> UserDetailedResponse | None:
+        query = (
+            select(User, UserCounters)
+            .outerjoin(UserCounters, UserCounters.user_id == User.id)
+            .where(User.id == id_)
+        )
+        result = (await self.db.execute(query)).one_or_none()
+        if not result:
+            return None
+        user, counters = result
+        return UserDetailedResponse(
+            id=user.id,
+            name=user.name,
+            avatar=user.avatar,
+            user_type=user.user_type,
+            counters=(
+                UserCountersRead.from_orm(counters) if counters else UserCountersRead()
+            ),
+        )
+
+    async def get_user_etag(self, user_id: int) -> str | None:
+        query = select(User.id, User.updated_at).where(User.id == user_id)
+        result = (await self.db.execute(query)).one_or_none()
+        return make_etag("user", *result) if result else None
+
     async def get_all_users_ordered(
         self,
         users_filter: UserFilter,
-        order_by: Any = None,
-    ) -> list[UserReadResponse] | None:
-        query = self._get_all_users_query(
-            users_filter=users_filter,
-            order_by=order_by,
+        params: CursorParams,
+    ) -> CursorPage[UserReadResponse]:
+        query = self._get_all_users_query(users_filter=users_filter)
+        rows, next_cursor = await paginate_keyset(
+            self.db,
+            query,
+            keys=(User.name, User.id),
+            params=params,
+        )
+        return CursorPage(
+            items=[
+                construct_schema(
+                    UserReadResponse,
+                    id=row.id,
+                    name=row.name,
+                    avatar=row.avatar,
+                    user_type=row.user_type,
+                ) for row in rows
+            ],
+            next_cursor=next_cursor,
         )
-        db_result = (await self.db.execute(query)).fetchall()
-        return [
-            UserReadResponse(
-                id=row[0].id,
-                name=row[0].name,
-                avatar=row[0].avatar,
-                user_type=row[0].user_type,
-            ) for row in db_result
-        ] if db_result else None
 
     async def create_admin_user(self, user: UserCreate) -> User:
         db_user = User(
             name=user.name,
             avatar=user.avatar,
-            password_hash=get_password_hash(user.password),
+            password_hash=await get_password_hash_async(user.password),
             user_type=UserTypesEnum.ADMIN,
         )
         self.db.add(db_user)
@@ -62,7 +111,7 @@ class UserCrud(BaseCrud[User, UserCreate, UserUpdate]):
         db_user = User(
             name=user.name,
             avatar=user.avatar,
-            password_hash=get_password_hash(user.password),
+            password_hash=await get_password_hash_async(user.password),
         )
         self.db.add(db_user)
         await self.db.flush()
@@ -76,17 +125,31 @@ class UserCrud(BaseCrud[User, UserCreate, UserUpdate]):
         else:
             update_data = obj_in.dict(exclude_unset=True)
         if update_data.get("password"):
-            password_hash = get_password_hash(update_data["password"])
+            password_hash = await get_password_hash_async(update_data["password"])
             del update_data["password"]
             update_data["password_hash"] = password_hash
 
+        self._invalidate_principal(db_obj.id)
+        if "name" in update_data or "avatar" in update_data:
+            # Authors are embedded in the cached feed
+            on_commit(self.db, invalidate_approved_feed)
         return await super().update(db_obj=db_obj, obj_in=update_data)
 
+    async def delete(self, *, id_: int) -> User | None:
+        self._invalidate_principal(id_)
+        return await super().delete(id_=id_)
+
+    def _invalidate_principal(self, user_id: int) -> None:
+        # Once now, and again after commit, a concurrent request could have
+        # cached the old row before this transaction became visible
+        principal_cache.invalidate(user_id)
+        on_commit(self.db, partial(_invalidate_principal, user_id))
+
     async def authenticate(self, *, username: str, password: str) -> User | None:
         user = await self.get_by_name(name=username)
         if not user:
             return None
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             return None
 
         return user
@@ -95,25 +158,32 @@ class UserCrud(BaseCrud[User, UserCreate, UserUpdate]):
     def is_superuser(user: User) -> bool:
         return user.user_type == UserTypesEnum.ADMIN
 
-    @staticmethod
-    def _get_all_users_query(
-            users_filter: UserFilter,
-            order_by: Any,
-            order: IOrderEnum | None = None,
-    ) -> Select:
-        query = (
-            select(User)
-            .where(
-                and_(
-                    or_(not users_filter.name, User.name == users_filter.name),
-                    or_(not users_filter.user_type, User.user_type == users_filter.user_type),
+    def _get_all_users_query(self, users_filter: UserFilter) -> Select:
+        query = select(User.id, User.name, User.avatar, User.user_type).where(
+            or_(not users_filter.user_type, User.user_type == users_filter.user_type),
+        )
+        if users_filter.name:
+            query = query.where(
+                self._name_matches(users_filter.name, f"%{users_filter.name}%")
+            )
+        if users_filter.name_prefix:
+            query = query.where(
+                self._name_matches(
+                    users_filter.name_prefix, f"{users_filter.name_prefix}%"
                 )
             )
-        )
-
-        if order == IOrderEnum.ascendent:
-            query = query.order_by(order_by.asc())
-        else:
-            query = query.order_by(order_by.desc())  # type: ignore
-
         return query
+
+    def _name_matches(self, term: str, pattern: str) -> ColumnElement[bool]:
+        # Names are alphanumeric, so other input can't match and the term
+        # never needs LIKE escaping
+        if not term.isalnum():
+            return false()
+
+        # Shorter terms have no trigram to look up and would scan the whole
+        # FTS table, the name index scan stops at the first page of matches
+        if self.db.get_bind().dialect.name == "sqlite" and len(term) >= 3:
+            fts = table(USER_NAME_FTS_TABLE, column("rowid"), column("name"))
+            return User.id.in_(select(fts.c.rowid).where(fts.c.name.like(pattern)))
+        # Served by the pg_trgm index on PostgreSQL
+        return User.name.ilike(pattern)
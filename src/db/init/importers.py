@@ -0,0 +1,175 @@
+import csv
+import json
+import logging
+import time
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import Column, Table, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from db.models.exercise import Exercise
+from db.models.post import Post
+from db.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Import order follows the foreign keys, owners have to exist first
+IMPORT_TABLES: dict[str, Table] = {
+    "users": User.__table__,
+    "exercises": Exercise.__table__,
+    "posts": Post.__table__,
+}
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+
+
+def read_records(path: Path) -> Iterator[dict[str, Any]]:
+    """
+    Lazily read a NDJSON or CSV dump, one dict per line, by file extension.
+    """
+    with path.open(newline="", encoding="utf-8") as dump:
+        if path.suffix in NDJSON_SUFFIXES:
+            for line in dump:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(dump)
+
+
+def _coerce(column: Column, value: Any) -> Any:
+    if value is None or (value == "" and column.nullable):
+        return None
+    enum_class = getattr(column.type, "enum_class", None)
+    if enum_class is not None:
+        # dumps may hold either the API value ("approved") or the name
+        try:
+            return enum_class(value)
+        except ValueError:
+            return enum_class[value]
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+class TableImporter:
+    """
+    Stream a dump into one table in batches of `batch_size` rows.
+
+    PostgreSQL batches go through asyncpg `COPY`, everything else through
+    a single executemany INSERT per batch; either way a table is imported in
+    one transaction. A batch writes every column any of its records has,
+    plus those with a Python default; values a record doesn't have get that
+    default, or NULL. Keys that aren't columns of the table are skipped with
+    a warning.
+    """
+
+    def __init__(self, engine: AsyncEngine, table: Table, batch_size: int):
+        self.engine = engine
+        self.table = table
+        self.batch_size = batch_size
+        self.is_postgres = engine.dialect.name == "postgresql"
+        self._unknown_keys: set[str] = set()
+
+    def _columns(self, records: list[dict[str, Any]]) -> list[Column]:
+        keys = set().union(*records)
+        unknown = keys - set(self.table.columns.keys()) - self._unknown_keys
+        if unknown:
+            logger.warning(
+                "%s: skipping unknown keys %s", self.table.name, sorted(unknown)
+            )
+            self._unknown_keys |= unknown
+        return [
+            column
+            for column in self.table.columns
+            if column.key in keys or column.default is not None
+        ]
+
+    def _row(self, columns: list[Column], record: dict[str, Any]) -> tuple:
+        row = []
+        for column in columns:
+            if column.key in record:
+                value = _coerce(column, record[column.key])
+            elif column.default is None:
+                value = None
+            elif column.default.is_callable:
+                value = column.default.arg(None)
+            else:
+                value = column.default.arg
+            if self.is_postgres and isinstance(value, Enum):
+                # native PostgreSQL enums are created from the member names
+                value = value.name
+            row.append(value)
+        return tuple(row)
+
+    def _batches(
+        self, records: Iterable[dict[str, Any]]
+    ) -> Iterator[tuple[list[Column], list[tuple]]]:
+        records = iter(records)
+        for batch in iter(lambda: list(islice(records, self.batch_size)), []):
+            columns = self._columns(batch)
+            yield columns, [self._row(columns, record) for record in batch]
+
+    async def run(self, records: Iterable[dict[str, Any]]) -> int:
+        if self.is_postgres:
+            return await self._copy(self._batches(records))
+        return await self._insert(self._batches(records))
+
+    async def _copy(
+        self, batches: Iterator[tuple[list[Column], list[tuple]]]
+    ) -> int:
+        progress = _Progress(self.table.name)
+        async with self.engine.connect() as conn:
+            raw_connection = await conn.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            async with driver_connection.transaction():
+                for columns, batch in batches:
+                    await driver_connection.copy_records_to_table(
+                        self.table.name,
+                        records=batch,
+                        columns=[column.name for column in columns],
+                    )
+                    progress.add(len(batch))
+                # COPY writes explicit ids, so the serial has to be moved past them
+                await driver_connection.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{self.table.name}', 'id'), "
+                    f"coalesce(max(id), 1), max(id) IS NOT NULL) FROM {self.table.name}"
+                )
+        return progress.count
+
+    async def _insert(
+        self, batches: Iterator[tuple[list[Column], list[tuple]]]
+    ) -> int:
+        progress = _Progress(self.table.name)
+        async with self.engine.begin() as conn:
+            for columns, batch in batches:
+                await conn.execute(
+                    insert(self.table),
+                    [
+                        {column.key: value for column, value in zip(columns, row)}
+                        for row in batch
+                    ],
+                )
+                progress.add(len(batch))
+        return progress.count
+
+
+class _Progress:
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.started = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.count / elapsed if elapsed else float(self.count)
+
+    def add(self, rows: int) -> None:
+        self.count += rows
+        logger.info(
+            "%s: %d rows imported (%.0f rows/s)", self.name, self.count, self.rate
+        )
@@ -0,0 +1,27 @@
+import enum
+
+from sqlalchemy import Column, Date, Enum, ForeignKey, Integer
+
+from .base import Base
+
+
+class ContentKindsEnum(str, enum.Enum):
+    POST = "post"
+    EXERCISE = "exercise"
+
+
+class ContentRollup(Base):
+    """
+    Daily count of content per author, kept up to date by the post and
+    exercise CRUDs so statistics read pre-aggregated rows. Posts are counted
+    on the day they were created, exercises on the day they took place.
+    """
+
+    __tablename__ = "content_rollups"
+    # Key order serves the `kind` + day range scans of the statistics
+    kind: Enum = Column(Enum(ContentKindsEnum), primary_key=True)
+    day: Date = Column(Date, primary_key=True)
+    owner: int = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    count: int = Column(Integer, nullable=False, default=0)
@@ -1,20 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Column, Index, Integer, String, DateTime, func, ForeignKey
 
 from .base import Base
 
 
 class Exercise(Base):
     __tablename__ = "exercises"
+    __table_args__ = (
+        Index("ix_exercises_owner_time", "owner", "time"),
+    )
     id: int = Column(
         "id",
         Integer,
         autoincrement=True,
         nullable=False,
-        unique=True,
         primary_key=True,
-        index=True,
     )
     text: str = Column(String(1000), nullable=False)
     photo: str = Column(String(200), nullable=True)
     time: DateTime = Column(DateTime, nullable=False)
-    owner: int = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    owner: int = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Length of the session in seconds, counted into the meditation time
+    duration: int = Column(Integer, nullable=True)
+    # Set on every write, ETags of the row are derived from it
+    updated_at: DateTime = Column(
+        DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -1,6 +1,7 @@
 import enum
+from datetime import datetime
 
-from sqlalchemy import Column, Integer, DateTime, func, String, ForeignKey, Enum
+from sqlalchemy import Column, Index, Integer, DateTime, func, String, ForeignKey, Enum
 
 from .base import Base
 
@@ -10,21 +11,42 @@ class PostStatusesEnum(str, enum.Enum):
     REJECTED = "rejected"
     WAITING = "waiting for review"
 
+# Full-text search is maintained outside of the model by migration
+# c5c0bd07afb2: a generated `search_vector` column with a GIN index on
+# PostgreSQL and an external-content FTS5 table on SQLite.
+POST_SEARCH_CONFIG = "simple"
+POST_SEARCH_VECTOR = "search_vector"
+POST_SEARCH_FTS_TABLE = "posts_fts"
+
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_owner_time", "owner", "time"),
+        Index("ix_posts_status_time", "status", "time"),
+        # Unfiltered listings walk posts newest first by (time, id)
+        Index("ix_posts_time_id", "time", "id"),
+    )
     id: int = Column(
         "id",
         Integer,
         autoincrement=True,
         nullable=False,
-        unique=True,
         primary_key=True,
-        index=True,
     )
     title: str = Column(String(150), nullable=False)
     description: str = Column(String(1000), nullable=True)
-    time: DateTime = Column(DateTime, nullable=False, server_default=func.now())
+    # Set in Python so SQLite stores it in the format keyset cursors bind
+    time: DateTime = Column(
+        DateTime, nullable=False, default=datetime.utcnow, server_default=func.now()
+    )
     photo: str = Column(String(500), nullable=True)
-    owner: int = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    owner: int = Column(Integer, ForeignKey("users.id"), nullable=False)
     status: Enum = Column(Enum(PostStatusesEnum), default=PostStatusesEnum.WAITING)
+    # Moderation lease, see PostCrud.claim_waiting_posts
+    claimed_by: int = Column(Integer, ForeignKey("users.id"), nullable=True)
+    claimed_until: DateTime = Column(DateTime, nullable=True)
+    # Set on every write, ETags of the row are derived from it
+    updated_at: DateTime = Column(
+        DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
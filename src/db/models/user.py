@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import enum
+from datetime import datetime
 
 from sqlalchemy import (
     Column,
+    DateTime,
     Integer,
     String,
     Enum,
@@ -16,6 +18,11 @@ class UserTypesEnum(str, enum.Enum):
     ADMIN = "admin"
     USER = "user"
 
+# Substring search over names is indexed outside of the model by migration
+# fe9b535469e9: a pg_trgm GIN index on PostgreSQL and an FTS5 trigram table
+# on SQLite.
+USER_NAME_FTS_TABLE = "users_name_fts"
+
 
 class User(Base):
     __tablename__ = "users"
@@ -24,11 +31,13 @@ class User(Base):
         Integer,
         autoincrement=True,
         nullable=False,
-        unique=True,
         primary_key=True,
-        index=True,
     )
     name: str = Column(String(25), unique=True, index=True, nullable=False)
     avatar: str = Column(String(150), nullable=True)
     user_type: Enum = Column(Enum(UserTypesEnum), default=UserTypesEnum.USER)
     password_hash: str = Column(String(60), nullable=False)
+    # Set on every write, ETags of the row are derived from it
+    updated_at: DateTime = Column(
+        DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
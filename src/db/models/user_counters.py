@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+
+from .base import Base
+
+
+class UserCounters(Base):
+    """
+    Per-user content counts, kept up to date by the post and exercise CRUDs
+    so profiles never have to count rows. `reconcile_counters.py` recomputes
+    them from scratch.
+    """
+
+    __tablename__ = "user_counters"
+    user_id: int = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    posts_waiting: int = Column(Integer, nullable=False, default=0)
+    posts_approved: int = Column(Integer, nullable=False, default=0)
+    posts_rejected: int = Column(Integer, nullable=False, default=0)
+    exercises: int = Column(Integer, nullable=False, default=0)
+    meditation_seconds: int = Column(BigInteger, nullable=False, default=0)
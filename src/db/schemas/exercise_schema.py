@@ -6,6 +6,7 @@ class ExerciseBase(BaseModel):
     text: str = Field(min_length=3, max_length=1000)
     time: datetime
     photo: str | None = None
+    duration: int | None = Field(None, ge=0, description="Session length in seconds")
 
 
 class ExerciseCreate(ExerciseBase):
@@ -25,3 +26,13 @@ class ExerciseRead(ExerciseBase):
 
 class ExerciseReadResponse(ExerciseRead):
     pass
+
+
+class ExerciseStats(BaseModel):
+    current_streak: int = Field(description="Consecutive days of practice up to today")
+    longest_streak: int
+    sessions_per_week: float = Field(
+        description="Average sessions per week since the first one"
+    )
+    total_sessions: int
+    total_seconds: int
@@ -1,7 +1,10 @@
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 from db.models.post import PostStatusesEnum
 from db.schemas.user_schema import UserRead
+from settings import settings
 
 
 class PostBase(BaseModel):
@@ -43,6 +46,21 @@ class PostAdminUpdate(PostAdminBase):
     pass
 
 
+class PostAdminBulkStatusUpdate(BaseModel):
+    ids: list[int] = Field(..., min_items=1, max_items=settings.BULK_MAX_ITEMS)
+    status: PostStatusesEnum
+
+
+class PostAdminBulkStatusUpdateResult(BaseModel):
+    updated_ids: list[int]
+    not_found_ids: list[int]
+
+
+class PostModerationBatch(BaseModel):
+    claimed_until: datetime
+    items: list[PostReadResponse]
+
+
 class PostFilter(BaseModel):
     owner: int | None = Field(None, example=1, description="Post author's ID")
     title: str | None = Field(None, example="Title", description="Post title")
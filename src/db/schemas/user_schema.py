@@ -37,6 +37,21 @@ class UserReadResponse(UserRead):
     pass
 
 
+class UserCountersRead(BaseModel):
+    posts_waiting: int = 0
+    posts_approved: int = 0
+    posts_rejected: int = 0
+    exercises: int = 0
+    meditation_seconds: int = 0
+
+    class Config:
+        orm_mode = True
+
+
+class UserDetailedResponse(UserRead):
+    counters: UserCountersRead
+
+
 class UserCreate(UserBase):
     password: str = Field(..., min_length=8, max_length=32)
 
@@ -72,6 +87,11 @@ class UserFilter(BaseModel):
         example="Username",
         description="Searched substring in the user name"
     )
+    name_prefix: str | None = Field(
+        None,
+        example="User",
+        description="Searched prefix of the user name"
+    )
     user_type: UserTypesEnum | None = Field(
         None, example="user",
         description="User Type"
@@ -1,25 +1,68 @@
-from fastapi import Depends
+from typing import AsyncIterator
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-from db.config import get_session
+from auth.tokens import get_bearer_subject
+from db.config import (
+    get_read_only_session,
+    get_session,
+    run_on_commit_callbacks,
+    set_session_principal,
+)
+from db.crud.content_rollup_crud import ContentRollupCrud
 from db.crud.exercise_crud import ExerciseCrud
 from db.crud.post_crud import PostCrud
 from db.crud.user_crud import UserCrud
 
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
-async def get_user_crud(async_session: sessionmaker = Depends(get_session)):
-    async with async_session() as session:
-        async with session.begin():
-            yield UserCrud(session)
 
+async def get_db_session(
+    request: Request,
+    async_session: sessionmaker = Depends(get_session),
+    read_only_session: sessionmaker = Depends(get_read_only_session),
+) -> AsyncIterator[AsyncSession]:
+    """
+    One session per request.
 
-async def get_exercise_crud(async_session: sessionmaker = Depends(get_session)):
-    async with async_session() as session:
-        async with session.begin():
-            yield ExerciseCrud(session)
+    FastAPI caches dependencies within a request, so every CRUD dependency
+    (including the ones pulled in by the auth dependencies) shares it.
+    Safe methods get an autocommit session without BEGIN/COMMIT, everything
+    else runs in a single transaction.
 
+    The bearer token, if any, is read before the first query, so public
+    endpoints also keep a caller inside their read-your-writes window on
+    the primary.
+    """
+    principal_id = get_bearer_subject(request.headers.get("authorization"))
+    if request.method in READ_ONLY_METHODS:
+        async with read_only_session() as session:
+            set_session_principal(session, principal_id)
+            yield session
+        return
 
-async def get_post_crud(async_session: sessionmaker = Depends(get_session)):
     async with async_session() as session:
+        set_session_principal(session, principal_id)
         async with session.begin():
-            yield PostCrud(session)
+            yield session
+        await run_on_commit_callbacks(session)
+
+
+def get_user_crud(session: AsyncSession = Depends(get_db_session)) -> UserCrud:
+    return UserCrud(session)
+
+
+def get_exercise_crud(session: AsyncSession = Depends(get_db_session)) -> ExerciseCrud:
+    return ExerciseCrud(session)
+
+
+def get_post_crud(session: AsyncSession = Depends(get_db_session)) -> PostCrud:
+    return PostCrud(session)
+
+
+def get_content_rollup_crud(
+    session: AsyncSession = Depends(get_db_session),
+) -> ContentRollupCrud:
+    return ContentRollupCrud(session)
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from db.config import SessionLocal, engine
+from db.crud.content_rollup_crud import ContentRollupCrud
+from db.crud.user_counters_crud import UserCountersCrud
+from db.init.importers import IMPORT_TABLES, TableImporter, read_records
+from settings import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Import NDJSON (.ndjson/.jsonl) or CSV dumps into the database."
+    )
+    for name in IMPORT_TABLES:
+        parser.add_argument(f"--{name}", type=Path, help=f"dump of {name}")
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    for name, table in IMPORT_TABLES.items():
+        path = getattr(args, name)
+        if path is None:
+            continue
+        logger.info("Importing %s from %s", name, path)
+        started = time.monotonic()
+        importer = TableImporter(engine, table, batch_size=args.batch_size)
+        imported = await importer.run(read_records(path))
+        elapsed = time.monotonic() - started
+        logger.info(
+            "Imported %d %s in %.1fs (%.0f rows/s)",
+            imported,
+            name,
+            elapsed,
+            imported / elapsed if elapsed else imported,
+        )
+    if args.posts or args.exercises:
+        await rebuild_counters()
+    await engine.dispose()
+
+
+async def rebuild_counters() -> None:
+    """
+    The importer writes around the CRUD layer, so the user counters and
+    daily rollups are recomputed from the imported rows.
+    """
+    logger.info("Rebuilding user counters and daily rollups")
+    async with SessionLocal() as session:
+        async with session.begin():
+            drift = await UserCountersCrud(session).reconcile()
+            rollup_drift = await ContentRollupCrud(session).reconcile()
+    logger.info(
+        "Rebuilt counters of %d users and %d daily rollups", len(drift), rollup_drift
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
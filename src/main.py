@@ -10,6 +10,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from api.api_v1.api import api_router
 from db.init.init_db import init_db
 from logger import get_uvicorn_log_config, init_logger
+from services.compression import CompressionMiddleware
 from settings import settings
 
 init_logger()
@@ -21,6 +22,13 @@ app = FastAPI(
 )
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    compresslevel=settings.COMPRESSION_LEVEL,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOW_ORIGINS,
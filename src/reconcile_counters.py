@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import logging
+
+from db.config import SessionLocal
+from db.crud.content_rollup_crud import ContentRollupCrud
+from db.crud.user_counters_crud import UserCountersCrud
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Recompute user_counters and content_rollups from posts and "
+            "exercises and report drift."
+        )
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report the drift, don't overwrite the counters and rollups",
+    )
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    async with SessionLocal() as session:
+        async with session.begin():
+            drift = await UserCountersCrud(session).reconcile(fix=not args.dry_run)
+            rollup_drift = await ContentRollupCrud(session).reconcile(
+                fix=not args.dry_run
+            )
+
+    for user_id, changed in drift.items():
+        logger.warning(
+            "User %d drifted: %s",
+            user_id,
+            ", ".join(
+                f"{field} {stored} -> {actual}"
+                for field, (stored, actual) in changed.items()
+            ),
+        )
+    logger.info(
+        "%d users with drifted counters%s",
+        len(drift),
+        "" if args.dry_run or not drift else ", fixed",
+    )
+    logger.info(
+        "%d drifted daily rollups%s",
+        rollup_drift,
+        "" if args.dry_run or not rollup_drift else ", fixed",
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,45 @@
 from enum import Enum
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field
+from pydantic.generics import GenericModel
+
+from settings import settings
+
+ItemType = TypeVar("ItemType")
 
 
 class IOrderEnum(str, Enum):
     ascendent = "ascendent"
     descendent = "descendent"
+
+
+class ICountModeEnum(str, Enum):
+    exact = "exact"
+    window = "window"
+    estimated = "estimated"
+
+
+class IPeriodEnum(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class IExportFormatEnum(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class CursorParams(BaseModel):
+    cursor: str | None = Field(
+        None, description="Opaque cursor returned as `next_cursor` by the previous page"
+    )
+    limit: int = Field(
+        settings.PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE, description="Page size"
+    )
+
+
+class CursorPage(GenericModel, Generic[ItemType]):
+    items: list[ItemType]
+    next_cursor: str | None = None
@@ -30,6 +30,16 @@ class TopicsByTimeChunk(BaseModel):
     topics_count: int
 
 
+class ExercisesByUser(BaseModel):
+    username: str
+    exercises_count: int
+
+
+class ExercisesByTimeChunk(BaseModel):
+    date_start: datetime
+    exercises_count: int
+
+
 class PeriodsOfYears(BaseModel):
     year_start: int | None = None
     year_end: int | None = None
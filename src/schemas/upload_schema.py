@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class UploadRead(BaseModel):
+    name: str
+    url: str
+    size: int
+    content_type: str
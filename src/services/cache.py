@@ -0,0 +1,7 @@
+from aiocache import Cache
+
+from settings import settings
+
+# Shared application cache, in-process by default; point CACHE_URL at a
+# Redis/Memcached instance to share it between workers.
+cache = Cache.from_url(settings.CACHE_URL)
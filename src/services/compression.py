@@ -0,0 +1,120 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Status codes that never carry a body worth compressing
+_NO_BODY_STATUSES = {204, 304}
+
+
+def _accepts_gzip(headers: Headers) -> bool:
+    for coding in headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.strip().lower()
+        if not params.startswith("q="):
+            return True
+        try:
+            return float(params[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+class CompressionMiddleware:
+    """
+    Gzip responses of allowlisted content types once they reach `minimum_size`.
+
+    Unlike starlette's GZipMiddleware, every chunk of a streaming response is
+    flushed as soon as it is compressed, so NDJSON/CSV exports still reach
+    the client batch by batch. Responses that are already encoded are left
+    alone and ETags are weakened, the compressed bytes differ from the
+    representation they were computed for.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        compresslevel: int = 6,
+        content_types: list[str] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.content_types = set(content_types or ["application/json"])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _accepts_gzip(Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, send: Send) -> None:
+        self.middleware = middleware
+        self._send = send
+        self.start_message: Message | None = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _is_compressible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        return (
+            message["status"] not in _NO_BODY_STATUSES
+            and "content-encoding" not in headers
+            and content_type in self.middleware.content_types
+        )
+
+    def _start_compression(self) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = "gzip"
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        # wbits 16 + MAX_WBITS writes a gzip header and trailer
+        self.compressor = zlib.compressobj(
+            self.middleware.compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._is_compressible(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+            self._start_compression()
+            if not more_body:
+                body = self.compressor.compress(body) + self.compressor.flush()
+                self.start_message["headers"].append(
+                    (b"content-length", str(len(body)).encode())
+                )
+                await self._send(self.start_message)
+                await self._send({**message, "body": body})
+                return
+            await self._send(self.start_message)
+
+        body = self.compressor.compress(body) + self.compressor.flush(
+            zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH
+        )
+        await self._send({**message, "body": body})
@@ -0,0 +1,29 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the values identifying a representation,
+    usually the ids and `updated_at` of the rows it is made of.
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return '"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, W/ prefixes are ignored
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.sql import Select
+
+from db.config import get_read_engine
+from schemas.common_schema import IExportFormatEnum
+from settings import settings
+
+EXPORT_MEDIA_TYPES = {
+    IExportFormatEnum.ndjson: "application/x-ndjson",
+    IExportFormatEnum.csv: "text/csv",
+}
+
+
+def export_response(
+    query: Select,
+    export_format: IExportFormatEnum,
+    filename: str,
+    principal_id: int | None = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(query, export_format, principal_id=principal_id),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{export_format.value}"'
+            )
+        },
+    )
+
+
+async def stream_export(
+    query: Select,
+    export_format: IExportFormatEnum,
+    principal_id: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream the rows of a column `query` as NDJSON or CSV.
+
+    Rows come through a server-side cursor in `EXPORT_BATCH_SIZE` batches and
+    every batch is encoded and sent before the next one is fetched, so memory
+    stays constant whatever the table size. The generator owns its
+    connection, which lives exactly as long as the response body.
+    """
+    # asyncpg only opens server-side cursors inside a transaction
+    read_engine = get_read_engine(principal_id, autocommit=False)
+    async with read_engine.connect() as conn:
+        async with conn.begin():
+            result = await conn.stream(
+                query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+            )
+            columns = list(result.keys())
+            if export_format == IExportFormatEnum.csv:
+                yield _encode_csv([columns])
+            async for rows in result.partitions():
+                if export_format == IExportFormatEnum.csv:
+                    yield _encode_csv(rows)
+                else:
+                    yield _encode_ndjson(columns, rows)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode_ndjson(columns: list[str], rows: Sequence[Row]) -> bytes:
+    return "".join(
+        json.dumps(
+            {column: _plain(value) for column, value in zip(columns, row)},
+            ensure_ascii=False,
+        )
+        + "\n"
+        for row in rows
+    ).encode()
+
+
+def _encode_csv(rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
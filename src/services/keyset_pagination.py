@@ -0,0 +1,81 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Sequence
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Row, tuple_
+from sqlalchemy.sql import Select
+
+from schemas.common_schema import CursorParams
+from services.pagination_ext import AsyncConn
+
+INVALID_CURSOR = HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(jsonable_encoder(list(values)), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[Any]) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError(cursor)
+        return [_coerce(value, key) for value, key in zip(values, keys)]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as exc:
+        raise INVALID_CURSOR from exc
+
+
+def _coerce(value: Any, key: Any) -> Any:
+    python_type = key.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+async def paginate_keyset(
+    conn: AsyncConn,
+    query: Select,
+    keys: Sequence[Any],
+    params: CursorParams,
+    *,
+    descending: bool = True,
+) -> tuple[Sequence[Row], str | None]:
+    """
+    Fetch one page of `query` ordered by the unique `keys` tuple.
+
+    The cursor holds the keys of the last returned row and the next page
+    continues strictly after it, so the database walks the index instead of
+    skipping OFFSET rows. `keys` are mapped attributes selected either as
+    columns or through their entity. Returns the rows and the cursor of the
+    next page (None on the last page).
+    """
+    if params.cursor:
+        after = decode_cursor(params.cursor, keys)
+        if descending:
+            query = query.where(tuple_(*keys) < tuple_(*after))
+        else:
+            query = query.where(tuple_(*keys) > tuple_(*after))
+
+    query = query.order_by(
+        *(key.desc() if descending else key.asc() for key in keys)
+    ).limit(params.limit + 1)
+    rows = (await conn.execute(query)).all()
+
+    if len(rows) <= params.limit:
+        return rows, None
+    rows = rows[: params.limit]
+    return rows, encode_cursor(_key_values(rows[-1], keys))
+
+
+def _key_values(row: Row, keys: Sequence[Any]) -> list[Any]:
+    mapping = row._mapping
+    return [
+        mapping[key] if key in mapping else getattr(mapping[key.class_], key.key)
+        for key in keys
+    ]
@@ -1,6 +1,11 @@
+import json
+import time
 from typing import Any
 from typing_extensions import TypeAlias
 
+from sqlalchemy import func, text
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import CompileError
 from sqlalchemy.sql import Select
 from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
 
@@ -10,8 +15,15 @@ from fastapi_pagination.types import AdditionalData, AsyncItemsTransformer
 from fastapi_pagination.utils import verify_params
 from fastapi_pagination.ext.sqlalchemy import count_query, _maybe_unique
 
+from schemas.common_schema import ICountModeEnum
+from settings import settings
+
 AsyncConn: TypeAlias = "AsyncSession | AsyncConnection"
 
+# compiled count statement -> (monotonic deadline, total)
+_MAX_CACHED_COUNTS = 1024
+_cached_counts: dict[str, tuple[float, int]] = {}
+
 
 def page_to_limit_offset(params: AbstractParams) -> RawParams:
     return params.to_raw_params().as_limit_offset()
@@ -22,17 +34,49 @@ async def paginate_func(
     query: Select,
     params: AbstractParams | None = None,
     *,
+    count_mode: ICountModeEnum = ICountModeEnum.exact,
     count_stmt: Select | None = None,
     transformer: AsyncItemsTransformer | None = None,
     additional_data: AdditionalData = None,
     unique: bool = True,
+    scalars: bool = True,
 ) -> Any:
+    """
+    Paginate `query` with limit/offset, counting the total per `count_mode`:
+
+    * `exact` - a separate `COUNT(*)` statement before the items;
+    * `window` - `COUNT(*) OVER()` in the items statement, one round-trip;
+    * `estimated` - the planner's row estimate on PostgreSQL, otherwise an
+      exact count cached for `ESTIMATED_COUNT_TTL_SECONDS`.
+
+    With `scalars=False` the transformer receives whole rows instead of the
+    first column of each row.
+    """
     params, _ = verify_params(params, "limit-offset")
+    raw_params = page_to_limit_offset(params)
+    page_query = query.limit(raw_params.limit).offset(raw_params.offset)
     count_q = count_stmt if count_stmt is not None else count_query(query)
-    total = await conn.scalar(count_q)
-    items = (await conn.execute(query)).scalars()
 
-    items = _maybe_unique(items, unique)
+    if count_mode == ICountModeEnum.window:
+        total_column = func.count().over().label("total_count")
+        result = await conn.execute(page_query.add_columns(total_column))
+        rows = _maybe_unique(result, unique)
+        items = [row[0] for row in rows] if scalars else rows
+        if rows:
+            total = rows[0].total_count
+        elif raw_params.offset:
+            # Past the last page the window has no rows to report the total on
+            total = await conn.scalar(count_q)
+        else:
+            total = 0
+    else:
+        if count_mode == ICountModeEnum.estimated:
+            total = await _estimated_total(conn, query, count_q)
+        else:
+            total = await conn.scalar(count_q)
+        result = await conn.execute(page_query)
+        items = _maybe_unique(result.scalars() if scalars else result, unique)
+
     # Not tested properly
     t_items = apply_items_transformer(items, transformer)
 
@@ -42,3 +86,41 @@ async def paginate_func(
         params,
         **(additional_data or {}),
     )
+
+
+def _dialect(conn: AsyncConn) -> Dialect:
+    if isinstance(conn, AsyncSession):
+        return conn.get_bind().dialect
+    return conn.dialect
+
+
+async def _estimated_total(conn: AsyncConn, query: Select, count_q: Select) -> int:
+    dialect = _dialect(conn)
+    if dialect.name == "postgresql":
+        try:
+            sql = query.order_by(None).compile(
+                dialect=dialect, compile_kwargs={"literal_binds": True}
+            )
+        except CompileError:
+            pass
+        else:
+            plan = await conn.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+    return await _cached_count(conn, count_q)
+
+
+async def _cached_count(conn: AsyncConn, count_q: Select) -> int:
+    compiled = count_q.compile()
+    key = f"{compiled}|{sorted(compiled.params.items(), key=str)}"
+    cached = _cached_counts.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    total = await conn.scalar(count_q)
+    if len(_cached_counts) >= _MAX_CACHED_COUNTS:
+        _cached_counts.clear()
+    _cached_counts[key] = (time.monotonic() + settings.ESTIMATED_COUNT_TTL_SECONDS, total)
+    return total
@@ -0,0 +1,65 @@
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from settings import settings
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ModelORJSONResponse(ORJSONResponse):
+    """
+    orjson response that also accepts pydantic models as content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, default=_default, option=orjson.OPT_NON_STR_KEYS
+        )
+
+
+def fast_json_response(
+    content: Any,
+    status_code: int | None = None,
+    response: Response | None = None,
+) -> Any:
+    """
+    Return already validated `content` without validating it again.
+
+    FastAPI validates whatever an endpoint returns against its
+    `response_model`, so models built by the CRUD layer are checked twice.
+    With FAST_JSON_RESPONSES on, `content` is serialized by orjson straight
+    away and `response_model` only documents the endpoint; otherwise it is
+    returned as is and goes through the regular FastAPI path.
+
+    Pass the endpoint's `response` parameter to keep the status code and
+    headers set on it, FastAPI drops them when an endpoint returns a
+    response of its own. `status_code` overrides the route's default and
+    needs `response` for the regular path to apply it.
+    """
+    if status_code is not None:
+        if response is None:
+            raise ValueError("fast_json_response needs `response` for a status_code")
+        response.status_code = status_code
+    if not settings.FAST_JSON_RESPONSES:
+        return content
+
+    if response is None:
+        return ModelORJSONResponse(content)
+    fast_response = ModelORJSONResponse(
+        content, status_code=response.status_code or 200
+    )
+    # Copied as raw headers, a dict would merge repeated ones like Set-Cookie
+    fast_response.raw_headers.extend(
+        (name, value)
+        for name, value in response.raw_headers
+        if name not in (b"content-length", b"content-type")
+    )
+    return fast_response
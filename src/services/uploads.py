@@ -0,0 +1,305 @@
+import hashlib
+import os
+import re
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator
+
+import anyio
+import anyio.to_thread
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from multipart.multipart import MultipartParser, parse_options_header
+
+from services.etag import etag_matches, not_modified
+from settings import settings
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of the accepted image formats -> stored extension
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "jpg",
+    b"\x89PNG\r\n\x1a\n": "png",
+    b"GIF87a": "gif",
+    b"GIF89a": "gif",
+}
+MEDIA_TYPES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+}
+UPLOAD_NAME_RE = re.compile(r"([0-9a-f]{64})\.(jpg|png|gif|webp)")
+_SIGNATURE_LENGTH = 12
+
+
+@dataclass
+class StoredUpload:
+    name: str
+    size: int
+    media_type: str
+    created: bool
+
+
+def _detect_extension(head: bytes) -> str | None:
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for signature, extension in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+def upload_path(name: str) -> Path | None:
+    """
+    Path of a stored upload, or None for names we could never have
+    produced, which also keeps clients inside UPLOAD_DIR.
+    """
+    match = UPLOAD_NAME_RE.fullmatch(name)
+    if not match:
+        return None
+    return settings.UPLOAD_DIR / match.group(1)[:2] / name
+
+
+class _FilePartParser:
+    """
+    Push parser collecting the data of the `field_name` file part.
+
+    Data passed to the callbacks only lives for the current `write`, so it
+    is copied into `pending` for the caller to drain after every chunk.
+    """
+
+    def __init__(self, boundary: bytes, field_name: str):
+        self.field_name = field_name
+        self.found = False
+        self.pending: list[bytes] = []
+        self._in_field = False
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def write(self, data: bytes) -> list[bytes]:
+        self._parser.write(data)
+        pending, self.pending = self.pending, []
+        return pending
+
+    def finalize(self) -> None:
+        self._parser.finalize()
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("latin-1")
+        # Only the first part with the expected name is stored
+        self._in_field = name == self.field_name and not self.found
+        self.found = self.found or self._in_field
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_field:
+            self.pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_field = False
+
+
+async def store_upload(request: Request, field_name: str = "file") -> StoredUpload:
+    """
+    Stream the `field_name` file of a multipart body to disk.
+
+    The body is hashed while it is written to a temporary file and never
+    held in memory as a whole; the file is then renamed to its SHA-256, so
+    identical images are stored once. Bodies over UPLOAD_MAX_BYTES are
+    rejected as soon as they cross the limit, anything that is not a JPEG,
+    PNG, GIF or WebP image once its first bytes are in.
+    """
+    content_type, options = parse_options_header(
+        request.headers.get("content-type", "")
+    )
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected a multipart/form-data body.",
+        )
+    # Leave room for the multipart framing around the file
+    content_length = request.headers.get("content-length", "")
+    if (
+        content_length.isdigit()
+        and int(content_length) > settings.UPLOAD_MAX_BYTES + CHUNK_SIZE
+    ):
+        raise _too_large()
+
+    tmp_dir = settings.UPLOAD_DIR / "tmp"
+    await anyio.Path(tmp_dir).mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / uuid.uuid4().hex
+    parser = _FilePartParser(boundary, field_name)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    extension = None
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as tmp:
+            async for chunk in request.stream():
+                for data in parser.write(chunk):
+                    size += len(data)
+                    if size > settings.UPLOAD_MAX_BYTES:
+                        raise _too_large()
+                    if extension is None:
+                        head = (head + data)[:_SIGNATURE_LENGTH]
+                        if len(head) == _SIGNATURE_LENGTH:
+                            extension = _check_image(head)
+                    digest.update(data)
+                    await tmp.write(data)
+            parser.finalize()
+
+        if not parser.found or not size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The `{field_name}` file is missing or empty.",
+            )
+        extension = extension or _check_image(head)
+
+        name = f"{digest.hexdigest()}.{extension}"
+        path = upload_path(name)
+        created = not await anyio.Path(path).exists()
+        if created:
+            await anyio.Path(path.parent).mkdir(parents=True, exist_ok=True)
+            # Atomic, a concurrent upload of the same image just replaces it
+            await anyio.to_thread.run_sync(os.replace, tmp_path, path)
+        return StoredUpload(
+            name=name, size=size, media_type=MEDIA_TYPES[extension], created=created
+        )
+    finally:
+        await anyio.Path(tmp_path).unlink(missing_ok=True)
+
+
+def _check_image(head: bytes) -> str:
+    extension = _detect_extension(head)
+    if extension is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Only JPEG, PNG, GIF and WebP images can be uploaded.",
+        )
+    return extension
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Uploads are limited to {settings.UPLOAD_MAX_BYTES} bytes.",
+    )
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    The (start, end) of a single `bytes=` range, inclusive. Raises 416 when
+    it can't be satisfied, returns None for ranges we serve in full.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        # Multipart byteranges aren't supported, the whole file is fine too
+        return None
+    first, _, last = ranges.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable.",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+async def _iter_range(path: Path, start: int, length: int) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(path, "rb") as file:
+        await file.seek(start)
+        while length > 0:
+            chunk = await file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+async def upload_response(request: Request, name: str) -> Response:
+    """
+    Serve a stored upload. Names are content hashes, so the files are
+    immutable: the hash doubles as the ETag and clients may cache them for
+    UPLOAD_CACHE_MAX_AGE_SECONDS. A single `Range` is answered with 206.
+    """
+    path = upload_path(name)
+    stat_result = None
+    if path is not None:
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, path)
+        except FileNotFoundError:
+            pass
+    if stat_result is None:
+        raise HTTPException(status_code=404, detail="File doesn't exist.")
+
+    etag = f'"{name.partition(".")[0]}"'
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": (
+            f"public, max-age={settings.UPLOAD_CACHE_MAX_AGE_SECONDS}, immutable"
+        ),
+    }
+    media_type = MEDIA_TYPES[name.rpartition(".")[2]]
+    size = stat_result.st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    byte_range = None
+    if range_header and (if_range is None or if_range == etag):
+        byte_range = _parse_range(range_header, size)
+    if byte_range is None:
+        return FileResponse(
+            path, media_type=media_type, headers=headers, stat_result=stat_result
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_range(path, start, end - start + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
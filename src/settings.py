@@ -16,12 +16,58 @@ class Settings(BaseSettings):
     ALLOW_ORIGINS: list = ["*"]
 
     API_V1_STR: str = "/api/v1"
+    # Serialize validated responses with orjson and skip response_model checks
+    FAST_JSON_RESPONSES: bool = False
+    # Cursor-paginated list endpoints
+    PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 500
+    # Largest list accepted by the bulk endpoints
+    BULK_MAX_ITEMS: int = 1000
+    # Posts handed to a moderator per claim and how long they stay reserved
+    MODERATION_CLAIM_SIZE: int = 20
+    MODERATION_LEASE_SECONDS: int = 300
+    # Rows fetched per server-side cursor round-trip by the export endpoints
+    EXPORT_BATCH_SIZE: int = 1000
+    # Rows sent per COPY/executemany call by import_data.py
+    IMPORT_BATCH_SIZE: int = 5000
+    # Widest date range and default window of the statistics endpoints
+    STATISTICS_MAX_DAYS: int = 3660
+    STATISTICS_DEFAULT_DAYS: int = 365
+    # How long `estimated` page totals reuse a counted value
+    ESTIMATED_COUNT_TTL_SECONDS: int = 60
+
+    # gzip for responses of these types once they reach the minimum size
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_CONTENT_TYPES: list = [
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+    ]
+
+    # Uploaded images, stored once per content hash
+    UPLOAD_DIR: Path = Path("./uploads")
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    # Stored files never change, clients may keep them for a year
+    UPLOAD_CACHE_MAX_AGE_SECONDS: int = 60 * 60 * 24 * 365
 
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
 
+    # Authenticated users kept in memory between requests
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    # bcrypt runs in a dedicated pool, extra requests wait in a bounded queue
+    PASSWORD_HASHING_WORKERS: int = 4
+    PASSWORD_HASHING_QUEUE_SIZE: int = 64
+
     DATABASE_URL: str
+    # Read-only requests are spread over these, writes always go to DATABASE_URL
+    DATABASE_REPLICA_URLS: list = []
+    # Reads of a user stay on the primary this long after their own write
+    READ_YOUR_WRITES_SECONDS: int = 5
     ECHO_SQL: bool = False
 
     LOG_LEVEL: str = "INFO"
@@ -31,6 +77,14 @@ class Settings(BaseSettings):
     UVICORN_ERROR_LOG_LEVEL: str = "INFO"
     UVICORN_LOG_HANDLERS: list = ["console"]
 
+    # aiocache backend URL, e.g. memory:// or redis://localhost:6379/0
+    CACHE_URL: str = "memory://"
+    # Safety net for caches that other workers can't invalidate
+    DAILY_EXERCISE_CACHE_TTL_SECONDS: int = 300
+    # Newest approved posts served from the cache by GET /posts/feed
+    FEED_CACHED_ITEMS: int = 200
+    FEED_CACHE_TTL_SECONDS: int = 300
+
     FIRST_SUPERUSER_NAME: str
     FIRST_SUPERUSER_PASSWORD: str
 
@@ -0,0 +1,126 @@
+import asyncio
+import importlib.util
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import pytest
+
+# Settings and the engine are created at import time, so the environment
+# has to point at the test database before the app is imported.
+DB_PATH = Path(tempfile.mkdtemp()) / "test.db"
+os.environ["APP_ENV"] = "production"
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["FIRST_SUPERUSER_NAME"] = "admin"
+os.environ["FIRST_SUPERUSER_PASSWORD"] = "admin-password"
+os.environ["LOG_DESTINATIONS"] = '["console"]'
+
+from alembic.migration import MigrationContext  # noqa: E402
+from alembic.operations import Operations  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+
+from auth.jwthandler import create_access_token  # noqa: E402
+from auth.principal_cache import principal_cache  # noqa: E402
+from db import config as db_config  # noqa: E402
+from db.init.init_db import init_db  # noqa: E402
+from db.models.base import Base  # noqa: E402
+from main import app  # noqa: E402
+from services.cache import cache  # noqa: E402
+from settings import settings  # noqa: E402
+
+API = settings.API_V1_STR
+MIGRATIONS = Path(__file__).parents[1] / "migrations" / "versions"
+
+
+def _reset_database() -> None:
+    # The initial migration is PostgreSQL only, the schema comes from the models
+    engine = create_engine(f"sqlite:///{DB_PATH}")
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture()
+def client() -> Iterator[TestClient]:
+    _reset_database()
+    principal_cache.clear()
+    db_config._recent_writes.clear()  # pylint: disable=protected-access
+    asyncio.run(cache.clear())
+    asyncio.run(init_db())
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture()
+def db() -> Iterator[sqlite3.Connection]:
+    connection = sqlite3.connect(DB_PATH)
+    connection.row_factory = sqlite3.Row
+    yield connection
+    connection.close()
+
+
+@pytest.fixture()
+def sqlite_migration(client: TestClient) -> Iterator[Callable[[str], None]]:
+    """
+    Apply the SQLite branch of a migration by revision. The test schema
+    comes from the models, so objects only migrations create, like the
+    full-text search tables, need this; they are dropped again afterwards
+    because drop_all doesn't know about them.
+    """
+    engine = create_engine(f"sqlite:///{DB_PATH}")
+    applied = []
+
+    def run(step: Callable[[], None]) -> None:
+        with engine.begin() as connection:
+            with Operations.context(MigrationContext.configure(connection)):
+                step()
+
+    def apply(revision: str) -> None:
+        path = next(MIGRATIONS.glob(f"{revision}_*.py"))
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        run(migration.upgrade)
+        applied.append(migration)
+
+    yield apply
+    for migration in reversed(applied):
+        run(migration.downgrade)
+    engine.dispose()
+
+
+def auth_headers(user_id: int) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+
+
+@pytest.fixture()
+def admin_headers(client: TestClient) -> dict[str, str]:
+    return auth_headers(1)
+
+
+@pytest.fixture()
+def user_headers(client: TestClient) -> dict[str, str]:
+    response = client.post(
+        f"{API}/register", json={"name": "bob", "password": "bob-password"}
+    )
+    assert response.status_code == 201, response.text
+    return auth_headers(response.json()["id"])
+
+
+@contextmanager
+def captured_statements() -> Iterator[list[tuple[str, tuple]]]:
+    statements: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sync_engine = db_config.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
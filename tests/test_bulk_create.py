@@ -0,0 +1,30 @@
+from conftest import API, captured_statements
+
+ITEMS = 200
+
+
+def test_bulk_exercises_are_one_insert(client, db, user_headers):
+    exercises = [
+        {"text": f"breathe {n}", "time": "2024-01-01T10:00:00", "duration": 60}
+        for n in range(ITEMS)
+    ]
+    with captured_statements() as statements:
+        response = client.post(
+            f"{API}/exercises/bulk", headers=user_headers, json=exercises
+        )
+    assert response.status_code == 200, response.text
+    assert [exercise["text"] for exercise in response.json()] == [
+        exercise["text"] for exercise in exercises
+    ]
+
+    inserts = [
+        statement
+        for statement, _ in statements
+        if statement.startswith("INSERT INTO exercises")
+    ]
+    assert len(inserts) == 1, inserts
+    assert db.execute("SELECT count(*) FROM exercises").fetchone()[0] == ITEMS
+
+    counters = client.get(f"{API}/users/me/", headers=user_headers).json()["counters"]
+    assert counters["exercises"] == ITEMS
+    assert counters["meditation_seconds"] == ITEMS * 60
@@ -0,0 +1,144 @@
+import asyncio
+
+from conftest import API, captured_statements
+from db.config import SessionLocal, run_on_commit_callbacks
+from db.crud.content_rollup_crud import ContentRollupCrud
+from db.crud.post_crud import PostCrud
+from db.crud.user_counters_crud import UserCountersCrud
+
+POSTS = 4
+
+
+def create_posts(client, headers) -> list[int]:
+    post_ids = []
+    for n in range(POSTS):
+        response = client.post(
+            f"{API}/posts/", headers=headers, json={"title": f"post {n}"}
+        )
+        assert response.status_code == 200, response.text
+        post_ids.append(response.json()["id"])
+    return post_ids
+
+
+def get_counters(client, headers) -> dict:
+    return client.get(f"{API}/users/me/", headers=headers).json()["counters"]
+
+
+def feed_titles(client) -> list[str]:
+    response = client.get(f"{API}/posts/feed")
+    assert response.status_code == 200, response.text
+    return [post["title"] for post in response.json()["items"]]
+
+
+def drift() -> tuple[dict, int]:
+    async def run() -> tuple[dict, int]:
+        async with SessionLocal() as session:
+            async with session.begin():
+                counters = await UserCountersCrud(session).reconcile(fix=False)
+                rollups = await ContentRollupCrud(session).reconcile(fix=False)
+        return counters, rollups
+
+    return asyncio.run(run())
+
+
+def test_bulk_status_update(client, admin_headers, user_headers):
+    post_ids = create_posts(client, user_headers)
+    assert feed_titles(client) == []
+
+    with captured_statements() as statements:
+        response = client.put(
+            f"{API}/posts/admin/bulk",
+            headers=admin_headers,
+            json={"ids": [*post_ids[:3], 999], "status": "approved"},
+        )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"updated_ids": post_ids[:3], "not_found_ids": [999]}
+    updates = [
+        statement
+        for statement, _ in statements
+        if statement.startswith("UPDATE posts")
+    ]
+    assert len(updates) == 1, updates
+
+    counters = get_counters(client, user_headers)
+    assert (counters["posts_waiting"], counters["posts_approved"]) == (1, 3)
+    # The cached feed is dropped once the update commits
+    assert feed_titles(client) == ["post 2", "post 1", "post 0"]
+
+    response = client.put(
+        f"{API}/posts/admin/bulk",
+        headers=admin_headers,
+        json={"ids": post_ids[:2], "status": "rejected"},
+    )
+    assert response.status_code == 200, response.text
+    counters = get_counters(client, user_headers)
+    assert counters["posts_approved"] == 1
+    assert counters["posts_rejected"] == 2
+    assert feed_titles(client) == ["post 2"]
+    assert drift() == ({}, 0)
+
+
+def test_bulk_status_update_input(client, admin_headers, user_headers):
+    body = {"ids": [1], "status": "approved"}
+    assert client.put(f"{API}/posts/admin/bulk", json=body).status_code == 401
+    # The superuser dependency answers 400 to regular users
+    response = client.put(f"{API}/posts/admin/bulk", headers=user_headers, json=body)
+    assert response.status_code == 400
+
+    for body in ({"ids": [], "status": "approved"}, {"ids": [1], "status": "gone"}):
+        response = client.put(
+            f"{API}/posts/admin/bulk", headers=admin_headers, json=body
+        )
+        assert response.status_code == 422, response.text
+
+
+def test_delete_many(client, admin_headers, user_headers, db):
+    post_ids = create_posts(client, user_headers)
+    client.put(
+        f"{API}/posts/admin/bulk",
+        headers=admin_headers,
+        json={"ids": post_ids[:2], "status": "approved"},
+    )
+    assert feed_titles(client) == ["post 1", "post 0"]
+
+    async def delete_many(ids: list[int]) -> list[int]:
+        async with SessionLocal() as session:
+            async with session.begin():
+                deleted_ids = await PostCrud(session).delete_many(ids=ids)
+            await run_on_commit_callbacks(session)
+        return sorted(deleted_ids)
+
+    assert asyncio.run(delete_many([post_ids[1], post_ids[2], 999])) == [
+        post_ids[1],
+        post_ids[2],
+    ]
+    assert asyncio.run(delete_many([])) == []
+    remaining = db.execute("SELECT id FROM posts ORDER BY id").fetchall()
+    assert [row[0] for row in remaining] == [post_ids[0], post_ids[3]]
+
+    counters = get_counters(client, user_headers)
+    assert (counters["posts_waiting"], counters["posts_approved"]) == (1, 1)
+    assert feed_titles(client) == ["post 0"]
+    assert drift() == ({}, 0)
+
+
+def test_update_many_without_values_or_ids(client, user_headers):
+    post_ids = create_posts(client, user_headers)
+
+    async def update_many(ids: list[int], values: dict) -> list[int]:
+        async with SessionLocal() as session:
+            async with session.begin():
+                updated_ids = await PostCrud(session).update_many(
+                    ids=ids, obj_in=values
+                )
+        return sorted(updated_ids)
+
+    with captured_statements() as statements:
+        assert asyncio.run(update_many(post_ids, {})) == []
+        assert asyncio.run(update_many([], {"title": "renamed"})) == []
+    assert not [s for s, _ in statements if s.startswith("UPDATE posts")]
+
+    # Without a status change the counters are left alone
+    assert asyncio.run(update_many(post_ids, {"title": "renamed"})) == post_ids
+    assert get_counters(client, user_headers)["posts_waiting"] == POSTS
+    assert drift() == ({}, 0)
@@ -0,0 +1,128 @@
+import asyncio
+import gzip
+import zlib
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from conftest import API
+from services.compression import CompressionMiddleware
+
+MINIMUM_SIZE = 100
+TYPES = ["application/json", "application/x-ndjson"]
+
+
+def run(response: Response, accept_encoding: str = "gzip") -> list[dict]:
+    """
+    Messages `response` sends through the middleware.
+    """
+    middleware = CompressionMiddleware(
+        response, minimum_size=MINIMUM_SIZE, content_types=TYPES
+    )
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive() -> dict:
+        if requests:
+            return requests.pop()
+        # The client stays connected, the response finishes first
+        await asyncio.Event().wait()
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return messages
+
+
+def headers_of(messages: list[dict]) -> Headers:
+    return Headers(raw=messages[0]["headers"])
+
+
+def body_of(messages: list[dict]) -> bytes:
+    return b"".join(message.get("body", b"") for message in messages[1:])
+
+
+def test_compresses_only_past_the_threshold():
+    small = run(JSONResponse({"a": "x" * 10}, headers={"ETag": '"t"'}))
+    assert "content-encoding" not in headers_of(small)
+    assert headers_of(small)["etag"] == '"t"'
+
+    data = {"a": "x" * MINIMUM_SIZE}
+    large = run(JSONResponse(data, headers={"ETag": '"t"'}))
+    headers = headers_of(large)
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == 'W/"t"'
+    body = body_of(large)
+    assert int(headers["content-length"]) == len(body)
+    assert gzip.decompress(body) == JSONResponse(data).body
+
+
+def test_skips_clients_types_and_encoded_bodies():
+    text = "x" * MINIMUM_SIZE * 2
+    encoded = gzip.compress(text.encode())
+    cases = [
+        (JSONResponse({"a": text}), "gzip;q=0"),
+        (JSONResponse({"a": text}), "br"),
+        (Response(text, media_type="image/png"), "gzip"),
+        (
+            Response(
+                encoded,
+                media_type="application/json",
+                headers={"Content-Encoding": "gzip"},
+            ),
+            "gzip",
+        ),
+        (Response(status_code=304, headers={"ETag": '"t"'}), "gzip"),
+    ]
+    for response, accept_encoding in cases:
+        messages = run(response, accept_encoding)
+        assert messages[0]["headers"] == response.raw_headers, accept_encoding
+        assert body_of(messages) == response.body
+
+    # Already encoded bodies are not compressed a second time
+    assert gzip.decompress(body_of(run(cases[3][0]))) == text.encode()
+
+
+def test_streams_are_compressed_chunk_by_chunk():
+    chunks = [b'{"n": %d}\n' % n * 5 for n in range(3)]
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    messages = run(StreamingResponse(stream(), media_type="application/x-ndjson"))
+    headers = headers_of(messages)
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+
+    # Every chunk is flushed on its own, so each decodes before the stream ends
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    bodies = [message["body"] for message in messages[1:] if message["body"]]
+    decoded = [decompressor.decompress(body) for body in bodies]
+    assert decoded[: len(chunks)] == chunks
+
+
+def test_app_export_is_compressed(client, user_headers):
+    for n in range(20):
+        client.post(
+            f"{API}/exercises/",
+            headers=user_headers,
+            json={"text": f"exercise {n}", "time": "2024-01-01T10:00:00"},
+        )
+
+    response = client.get(
+        f"{API}/exercises/export",
+        headers={**user_headers, "Accept-Encoding": "gzip"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert len(response.text.splitlines()) == 20
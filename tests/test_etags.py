@@ -0,0 +1,83 @@
+from conftest import API
+
+
+def get_with_etag(client, path: str, headers=None) -> str:
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.headers["etag"]
+
+
+def test_if_none_match_forms(client, admin_headers):
+    post_id = client.post(
+        f"{API}/posts/admin/", headers=admin_headers, json={"title": "hello"}
+    ).json()["id"]
+    path = f"{API}/posts/{post_id}"
+    etag = get_with_etag(client, path)
+
+    for header in (etag, f"W/{etag}", "*", f'"other", {etag}', f' "other" ,W/{etag}'):
+        response = client.get(path, headers={"If-None-Match": header})
+        assert response.status_code == 304, header
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    response = client.get(path, headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200, response.text
+
+
+def test_post_etag_changes_after_update(client, admin_headers):
+    post_id = client.post(
+        f"{API}/posts/admin/", headers=admin_headers, json={"title": "hello"}
+    ).json()["id"]
+    path = f"{API}/posts/{post_id}"
+    etag = get_with_etag(client, path)
+
+    response = client.put(
+        f"{API}/posts/admin/{post_id}",
+        headers=admin_headers,
+        params={"title": "hello again"},
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.text
+    assert response.headers["etag"] != etag
+    assert response.json()["title"] == "hello again"
+
+
+def test_exercise_etags_change_after_update(client, admin_headers):
+    exercise = {"text": "breathe", "time": "2024-01-01T10:00:00"}
+    exercise_id = client.post(
+        f"{API}/exercises/", headers=admin_headers, json=exercise
+    ).json()["id"]
+    path = f"{API}/exercises/{exercise_id}"
+    etag = get_with_etag(client, path)
+    daily = f"{API}/exercises/daily/"
+    daily_etag = get_with_etag(client, daily)
+    assert client.get(daily, headers={"If-None-Match": daily_etag}).status_code == 304
+
+    response = client.put(
+        path, headers=admin_headers, params={**exercise, "text": "breathe out"}
+    )
+    assert response.status_code == 200, response.text
+
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+    response = client.get(daily, headers={"If-None-Match": daily_etag})
+    assert response.status_code == 200
+    assert response.json()["text"] == "breathe out"
+
+
+def test_user_etag_changes_after_update(client, user_headers):
+    user_id = client.get(f"{API}/users/me/", headers=user_headers).json()["id"]
+    path = f"{API}/users/{user_id}"
+    etag = get_with_etag(client, path, user_headers)
+    response = client.get(path, headers={**user_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.put(
+        f"{API}/users/me/", headers=user_headers, json={"password": "new-password"}
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get(path, headers={**user_headers, "If-None-Match": etag})
+    assert response.status_code == 200, response.text
+    assert response.headers["etag"] != etag
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+from conftest import API
+from db.config import SessionLocal
+from db.crud.exercise_crud import ExerciseCrud, practice_streaks
+
+TODAY = date(2024, 3, 10)
+
+
+def days_ago(*offsets: int) -> list[date]:
+    return sorted(TODAY - timedelta(days=offset) for offset in offsets)
+
+
+def test_current_and_longest_streak():
+    # Four days in a row, a gap day, then the last two days
+    assert practice_streaks(days_ago(7, 6, 5, 4, 1, 0), TODAY) == (2, 4)
+    assert practice_streaks(days_ago(3, 2, 1, 0), TODAY) == (4, 4)
+    assert practice_streaks(days_ago(10, 8, 6), TODAY) == (0, 1)
+
+
+def test_streak_survives_until_the_end_of_today():
+    # Practice yesterday keeps the streak, today may still come
+    assert practice_streaks(days_ago(2, 1), TODAY) == (2, 2)
+    # A day without practice in between ends it
+    assert practice_streaks(days_ago(3, 2), TODAY) == (0, 2)
+
+
+def test_no_days_and_future_days():
+    assert practice_streaks([], TODAY) == (0, 0)
+    tomorrow = TODAY + timedelta(days=1)
+    assert practice_streaks([*days_ago(0), tomorrow], TODAY) == (1, 1)
+    assert practice_streaks([tomorrow], TODAY) == (0, 0)
+
+
+def get_stats(client, headers) -> dict:
+    response = client.get(f"{API}/exercises/stats/", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_stats_without_sessions(client, user_headers):
+    assert get_stats(client, user_headers) == {
+        "current_streak": 0,
+        "longest_streak": 0,
+        "sessions_per_week": 0.0,
+        "total_sessions": 0,
+        "total_seconds": 0,
+    }
+
+    response = client.post(
+        f"{API}/exercises/",
+        headers=user_headers,
+        json={"text": "breathe", "time": "2024-01-01T10:00:00"},
+    )
+    exercise_id = response.json()["id"]
+
+    async def delete() -> None:
+        async with SessionLocal() as session:
+            async with session.begin():
+                await ExerciseCrud(session).delete_many(ids=[exercise_id])
+
+    # The counters row is left at zero, with no practice days behind it
+    asyncio.run(delete())
+    stats = get_stats(client, user_headers)
+    assert stats["total_sessions"] == 0
+    assert stats["sessions_per_week"] == 0.0
+
+
+def test_stats_follow_the_sessions(client, user_headers):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    # Two sessions yesterday, one two weeks ago
+    for offset, duration in ((1, 600), (1, 300), (14, 60)):
+        response = client.post(
+            f"{API}/exercises/",
+            headers=user_headers,
+            json={
+                "text": "breathe",
+                "time": (today - timedelta(days=offset)).isoformat(),
+                "duration": duration,
+            },
+        )
+        assert response.status_code == 200, response.text
+
+    assert get_stats(client, user_headers) == {
+        "current_streak": 1,
+        "longest_streak": 1,
+        "sessions_per_week": 1.0,
+        "total_sessions": 3,
+        "total_seconds": 960,
+    }
@@ -0,0 +1,51 @@
+from conftest import API
+
+EXERCISE = {"text": "breathe", "time": "2024-01-01T10:00:00", "duration": 600}
+
+
+def create_exercise(client, headers) -> int:
+    response = client.post(f"{API}/exercises/", headers=headers, json=EXERCISE)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def update_exercise(client, exercise_id, headers=None, **params):
+    return client.put(
+        f"{API}/exercises/{exercise_id}",
+        headers=headers,
+        params={**EXERCISE, **params},
+    )
+
+
+def test_update_exercise_requires_owner_or_superuser(
+    client, admin_headers, user_headers
+):
+    admin_exercise = create_exercise(client, admin_headers)
+    user_exercise = create_exercise(client, user_headers)
+
+    response = update_exercise(client, admin_exercise, text="anonymous")
+    assert response.status_code == 401, response.text
+    response = update_exercise(client, admin_exercise, user_headers, text="stolen")
+    assert response.status_code == 403, response.text
+
+    daily = client.get(f"{API}/exercises/daily/").json()
+    assert daily["text"] == EXERCISE["text"]
+
+    response = update_exercise(client, user_exercise, user_headers, text="mine")
+    assert response.status_code == 200, response.text
+    response = update_exercise(
+        client, user_exercise, admin_headers, text="moderated", duration=60
+    )
+    assert response.status_code == 200, response.text
+
+    counters = client.get(f"{API}/users/me/", headers=user_headers).json()["counters"]
+    assert counters["meditation_seconds"] == 60
+
+
+def test_admin_exercise_update_refreshes_daily_exercise(client, admin_headers):
+    exercise_id = create_exercise(client, admin_headers)
+    assert client.get(f"{API}/exercises/daily/").json()["text"] == EXERCISE["text"]
+
+    response = update_exercise(client, exercise_id, admin_headers, text="renamed")
+    assert response.status_code == 200, response.text
+    assert client.get(f"{API}/exercises/daily/").json()["text"] == "renamed"
@@ -0,0 +1,83 @@
+import asyncio
+import csv
+import io
+import json
+
+from conftest import API
+from db.crud.exercise_crud import ExerciseCrud
+from schemas.common_schema import IExportFormatEnum
+from services.export import stream_export
+from settings import settings
+
+TRICKY_TEXT = 'commas, "quotes"\nand a newline'
+
+
+def create_exercises(client, headers, texts: list[str]) -> None:
+    for n, text in enumerate(texts):
+        response = client.post(
+            f"{API}/exercises/",
+            headers=headers,
+            json={"text": text, "time": f"2024-01-0{n + 1}T10:00:00"},
+        )
+        assert response.status_code == 200, response.text
+
+
+def test_exercise_export_ndjson(client, admin_headers, user_headers):
+    create_exercises(client, admin_headers, ["not mine"])
+    create_exercises(client, user_headers, ["breathe", TRICKY_TEXT])
+
+    response = client.get(f"{API}/exercises/export", headers=user_headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="exercises.ndjson"' in response.headers["content-disposition"]
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["text"] for record in records] == ["breathe", TRICKY_TEXT]
+    assert records[0]["time"] == "2024-01-01T10:00:00"
+    assert set(records[0]) == {"id", "text", "photo", "time", "duration", "owner"}
+
+
+def test_exercise_export_csv_quotes_values(client, user_headers):
+    create_exercises(client, user_headers, ["breathe", TRICKY_TEXT])
+
+    response = client.get(
+        f"{API}/exercises/export", headers=user_headers, params={"format": "csv"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text, newline="")))
+    assert [row["text"] for row in rows] == ["breathe", TRICKY_TEXT]
+    assert rows[0]["photo"] == ""
+
+
+def test_export_streams_one_chunk_per_batch(client, user_headers, monkeypatch):
+    create_exercises(client, user_headers, [f"exercise {n}" for n in range(5)])
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+
+    async def collect(export_format: IExportFormatEnum) -> list[bytes]:
+        query = ExerciseCrud.export_query(owner=2)
+        return [chunk async for chunk in stream_export(query, export_format)]
+
+    assert len(asyncio.run(collect(IExportFormatEnum.ndjson))) == 3
+    # The CSV header goes out on its own before the first batch
+    assert len(asyncio.run(collect(IExportFormatEnum.csv))) == 4
+
+
+def test_post_export_is_superuser_only(client, admin_headers, user_headers):
+    client.post(
+        f"{API}/posts/admin/",
+        headers=admin_headers,
+        json={"title": "hello", "status": "approved"},
+    )
+
+    assert client.get(f"{API}/posts/export").status_code == 401
+    # The superuser dependency answers 400 to regular users
+    assert client.get(f"{API}/posts/export", headers=user_headers).status_code == 400
+
+    response = client.get(f"{API}/posts/export", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [(record["title"], record["status"]) for record in records] == [
+        ("hello", "approved")
+    ]
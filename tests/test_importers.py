@@ -0,0 +1,74 @@
+import asyncio
+import json
+import logging
+import sys
+
+import import_data
+from conftest import API, auth_headers
+from db import config as db_config
+from db.init.importers import IMPORT_TABLES, TableImporter, read_records
+
+
+def import_dump(path, table: str, batch_size: int = 2) -> int:
+    importer = TableImporter(db_config.engine, IMPORT_TABLES[table], batch_size)
+    return asyncio.run(importer.run(read_records(path)))
+
+
+def test_sparse_ndjson_import(client, db, tmp_path, caplog):
+    dump = tmp_path / "posts.ndjson"
+    records = [
+        {"title": "first", "owner": 1, "photo": "a.png"},
+        {"title": "second", "owner": 1, "status": "approved"},
+        {"title": "third", "owner": 1, "photo": "b.png", "mood": "calm"},
+        {"title": "fourth", "owner": 1, "description": "late column"},
+    ]
+    dump.write_text("\n".join(json.dumps(record) for record in records) + "\n\n")
+
+    with caplog.at_level(logging.WARNING):
+        assert import_dump(dump, "posts") == 4
+
+    rows = db.execute(
+        "SELECT title, photo, description, status, time FROM posts ORDER BY id"
+    ).fetchall()
+    assert [tuple(row)[:4] for row in rows] == [
+        ("first", "a.png", None, "WAITING"),
+        ("second", None, None, "APPROVED"),
+        ("third", "b.png", None, "WAITING"),
+        ("fourth", None, "late column", "WAITING"),
+    ]
+    assert all(row["time"] for row in rows)
+    assert "unknown keys ['mood']" in caplog.text
+
+
+def test_csv_import(client, db, tmp_path):
+    dump = tmp_path / "exercises.csv"
+    dump.write_text(
+        "text,time,owner,duration,photo\n"
+        'breathe,2024-01-01T10:00:00,1,600,\n'
+        '"walk, slowly",2024-01-02T10:00:00,1,,b.png\n'
+        "sit,2024-01-03T10:00:00,1,60,\n"
+    )
+
+    assert import_dump(dump, "exercises") == 3
+
+    rows = db.execute(
+        "SELECT text, duration, photo FROM exercises ORDER BY id"
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("breathe", 600, None),
+        ("walk, slowly", None, "b.png"),
+        ("sit", 60, None),
+    ]
+
+
+def test_import_rebuilds_counters(client, tmp_path, monkeypatch):
+    dump = tmp_path / "exercises.ndjson"
+    dump.write_text(
+        json.dumps({"text": "breathe", "time": "2024-01-01T10:00:00", "owner": 1})
+        + "\n"
+    )
+    monkeypatch.setattr(sys, "argv", ["import_data.py", "--exercises", str(dump)])
+    asyncio.run(import_data.main())
+
+    admin = client.get(f"{API}/users/me/", headers=auth_headers(1)).json()
+    assert admin["counters"]["exercises"] == 1
@@ -0,0 +1,48 @@
+import pytest
+
+from conftest import API
+from settings import settings
+
+
+def walk_pages(client, path: str, limit: int, max_pages: int = 50) -> list[int]:
+    ids, cursor = [], None
+    for _ in range(max_pages):
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"{API}{path}", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+    pytest.fail(f"{path} didn't reach the last page, saw ids {ids}")
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_posts_pages_cover_every_post_once(client, admin_headers, limit):
+    response = client.post(
+        f"{API}/posts/admin/bulk",
+        headers=admin_headers,
+        json=[{"title": f"post {n}"} for n in range(5)],
+    )
+    assert response.status_code == 200, response.text
+    client.post(f"{API}/posts/", headers=admin_headers, json={"title": "single"})
+
+    ids = walk_pages(client, "/posts/", limit)
+    assert sorted(ids) == [1, 2, 3, 4, 5, 6]
+    assert len(ids) == len(set(ids))
+
+
+def test_feed_pages_past_the_cache_cover_every_post_once(
+    client, admin_headers, monkeypatch
+):
+    monkeypatch.setattr(settings, "FEED_CACHED_ITEMS", 2)
+    for n in range(5):
+        client.post(
+            f"{API}/posts/admin/",
+            headers=admin_headers,
+            json={"title": f"approved {n}", "status": "approved"},
+        )
+
+    ids = walk_pages(client, "/posts/feed", limit=1)
+    assert ids == [5, 4, 3, 2, 1]
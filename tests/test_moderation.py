@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import API, auth_headers
+
+POSTS = 5
+
+
+@pytest.fixture()
+def waiting_posts(client, db) -> list[int]:
+    db.execute(
+        "INSERT INTO users (id, name, user_type, password_hash) "
+        "VALUES (2, 'moderator', 'ADMIN', 'x')"
+    )
+    start = datetime(2024, 1, 1)
+    db.executemany(
+        "INSERT INTO posts (id, title, time, owner, status) "
+        "VALUES (?, ?, ?, 1, 'WAITING')",
+        [
+            (n, f"post {n}", (start + timedelta(minutes=n)).isoformat(" "))
+            for n in range(1, POSTS + 1)
+        ],
+    )
+    db.execute(
+        "INSERT INTO posts (id, title, time, owner, status) "
+        "VALUES (100, 'approved', ?, 1, 'APPROVED')",
+        (start.isoformat(" "),),
+    )
+    db.commit()
+    return list(range(1, POSTS + 1))
+
+
+def claim(client, user_id: int, limit: int) -> list[int]:
+    response = client.post(
+        f"{API}/posts/admin/moderation/claim",
+        headers=auth_headers(user_id),
+        params={"limit": limit},
+    )
+    assert response.status_code == 200, response.text
+    return [post["id"] for post in response.json()["items"]]
+
+
+def test_claims_are_capped_and_disjoint(client, db, waiting_posts):
+    first = claim(client, 1, limit=2)
+    second = claim(client, 2, limit=2)
+    rest = claim(client, 1, limit=10)
+
+    assert first == waiting_posts[:2]
+    assert second == waiting_posts[2:4]
+    assert rest == waiting_posts[4:]
+    assert claim(client, 2, limit=10) == []
+
+    owners = dict(db.execute("SELECT id, claimed_by FROM posts").fetchall())
+    assert owners == {1: 1, 2: 1, 3: 2, 4: 2, 5: 1, 100: None}
+
+
+def test_expired_claims_are_claimable_again(client, db, waiting_posts):
+    assert claim(client, 1, limit=3) == waiting_posts[:3]
+    db.execute(
+        "UPDATE posts SET claimed_until = ? WHERE id = 2",
+        ((datetime.utcnow() - timedelta(seconds=1)).isoformat(" "),),
+    )
+    db.commit()
+
+    assert claim(client, 2, limit=2) == [2, 4]
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi_pagination import Params
+from sqlalchemy import select
+
+from conftest import captured_statements
+from db.config import SessionLocal
+from db.models.post import Post
+from schemas.common_schema import ICountModeEnum
+from services import pagination_ext
+from services.pagination_ext import paginate_func
+from settings import settings
+
+
+@pytest.fixture(autouse=True)
+def cached_counts(monkeypatch) -> dict:
+    counts: dict = {}
+    monkeypatch.setattr(pagination_ext, "_cached_counts", counts)
+    return counts
+
+
+def add_posts(db, count: int) -> None:
+    start = db.execute("SELECT count(*) FROM posts").fetchone()[0]
+    db.executemany(
+        "INSERT INTO posts (title, time, owner, status) "
+        "VALUES (?, '2024-01-01 10:00:00', 1, 'APPROVED')",
+        [(f"post {n}",) for n in range(start, start + count)],
+    )
+    db.commit()
+
+
+def page(count_mode: ICountModeEnum, page: int = 1, size: int = 2):
+    async def run():
+        async with SessionLocal() as session:
+            return await paginate_func(
+                session,
+                select(Post.title).order_by(Post.id),
+                Params(page=page, size=size),
+                count_mode=count_mode,
+            )
+
+    return asyncio.run(run())
+
+
+def test_window_counts_in_the_items_statement(client, db):
+    add_posts(db, 3)
+
+    with captured_statements() as statements:
+        result = page(ICountModeEnum.window, page=2)
+    assert (result.items, result.total) == (["post 2"], 3)
+    assert len(statements) == 1
+    assert "OVER ()" in statements[0][0]
+
+
+def test_window_on_empty_and_past_the_end_pages(client, db):
+    with captured_statements() as statements:
+        result = page(ICountModeEnum.window)
+    assert (result.items, result.total) == ([], 0)
+    # The first page being empty means there is nothing to count
+    assert len(statements) == 1
+
+    add_posts(db, 3)
+    with captured_statements() as statements:
+        result = page(ICountModeEnum.window, page=5)
+    assert (result.items, result.total) == ([], 3)
+    assert len(statements) == 2
+    assert "count(*)" in statements[1][0]
+
+
+def test_estimated_falls_back_to_a_cached_count_on_sqlite(
+    client, db, cached_counts, monkeypatch
+):
+    add_posts(db, 3)
+
+    with captured_statements() as statements:
+        result = page(ICountModeEnum.estimated)
+    assert (result.items, result.total) == (["post 0", "post 1"], 3)
+    assert not [s for s, _ in statements if s.startswith("EXPLAIN")]
+    assert len(cached_counts) == 1
+
+    # Within the TTL the total lags behind new rows
+    add_posts(db, 2)
+    assert page(ICountModeEnum.estimated).total == 3
+    assert page(ICountModeEnum.exact).total == 5
+
+    later = time.monotonic() + settings.ESTIMATED_COUNT_TTL_SECONDS + 1
+    clock = SimpleNamespace(monotonic=lambda: later)
+    monkeypatch.setattr(pagination_ext, "time", clock)
+    assert page(ICountModeEnum.estimated).total == 5
+    assert page(ICountModeEnum.estimated, page=3).items == ["post 4"]
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import httpx
+
+from auth.users import get_password_hash, verify_password
+from conftest import API
+from main import app
+
+LOGINS = 8
+
+
+async def _concurrent_logins() -> tuple[list[int], float]:
+    """
+    Status codes of LOGINS simultaneous /access-token calls, and the longest
+    the event loop went without running a 1 ms heartbeat meanwhile.
+    """
+    max_gap = 0.0
+    done = asyncio.Event()
+
+    async def heartbeat() -> None:
+        nonlocal max_gap
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            max_gap = max(max_gap, now - last)
+            last = now
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        beat = asyncio.create_task(heartbeat())
+        responses = await asyncio.gather(
+            *(
+                ac.post(
+                    f"{API}/access-token",
+                    data={"username": "admin", "password": "admin-password"},
+                )
+                for _ in range(LOGINS)
+            )
+        )
+        done.set()
+        await beat
+    return [response.status_code for response in responses], max_gap
+
+
+def test_logins_do_not_block_the_event_loop(client):
+    password_hash = get_password_hash("admin-password")
+    started = time.perf_counter()
+    verify_password("admin-password", password_hash)
+    single = time.perf_counter() - started
+
+    statuses, max_gap = asyncio.run(_concurrent_logins())
+
+    assert statuses == [200] * LOGINS
+    # Hashing on the loop would stall it for at least one whole verification
+    assert max_gap < single / 2, (max_gap, single)
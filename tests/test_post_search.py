@@ -0,0 +1,61 @@
+import pytest
+
+from conftest import API
+
+
+@pytest.fixture()
+def search(client, sqlite_migration):
+    sqlite_migration("c5c0bd07afb2")
+
+    def run(q: str) -> list[str]:
+        response = client.get(f"{API}/posts/search", params={"q": q})
+        assert response.status_code == 200, response.text
+        return [post["title"] for post in response.json()["items"]]
+
+    return run
+
+
+def create_post(client, headers, title: str, description: str | None = None) -> int:
+    response = client.post(
+        f"{API}/posts/admin/",
+        headers=headers,
+        json={"title": title, "description": description, "status": "approved"},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def test_title_matches_rank_first(client, admin_headers, search):
+    create_post(client, admin_headers, "evening walk", "a quiet breathing practice")
+    create_post(client, admin_headers, "breathing basics", "start here")
+    create_post(client, admin_headers, "body scan", "lying down")
+
+    assert search("breathing") == ["breathing basics", "evening walk"]
+    assert search("breathing start") == ["breathing basics"]
+    assert search("mantra") == []
+
+
+def test_search_input_is_not_query_syntax(client, admin_headers, search):
+    create_post(client, admin_headers, "body scan")
+    create_post(client, admin_headers, "bodywork")
+
+    assert search('scan" OR "x') == []
+    # Not a prefix query, the tokenizer drops the star
+    assert search("body*") == ["body scan"]
+    for q in ("", "   "):
+        response = client.get(f"{API}/posts/search", params={"q": q})
+        assert response.status_code == 422, response.text
+
+
+def test_results_follow_post_edits(client, admin_headers, search):
+    post_id = create_post(client, admin_headers, "morning stretch")
+    assert search("stretch") == ["morning stretch"]
+
+    response = client.put(
+        f"{API}/posts/admin/{post_id}",
+        headers=admin_headers,
+        params={"title": "morning yoga"},
+    )
+    assert response.status_code == 200, response.text
+    assert search("stretch") == []
+    assert search("yoga") == ["morning yoga"]
@@ -0,0 +1,27 @@
+from auth.principal_cache import principal_cache
+from conftest import API
+from db.crud.base_crud import BaseCrud
+
+
+def test_user_update_drops_principal_cached_before_commit(
+    client, user_headers, monkeypatch
+):
+    me = client.get(f"{API}/users/me/", headers=user_headers).json()
+    stale_user = principal_cache.get(me["id"])
+    assert stale_user is not None
+
+    update = BaseCrud.update
+
+    async def update_racing_a_reader(self, *, db_obj, obj_in):
+        # Another request caches the old row after the early invalidation,
+        # before this transaction has committed
+        principal_cache.set(stale_user)
+        return await update(self, db_obj=db_obj, obj_in=obj_in)
+
+    monkeypatch.setattr(BaseCrud, "update", update_racing_a_reader)
+    response = client.put(
+        f"{API}/users/me/", headers=user_headers, json={"password": "new-password"}
+    )
+    assert response.status_code == 200, response.text
+
+    assert principal_cache.get(me["id"]) is None
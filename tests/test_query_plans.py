@@ -0,0 +1,168 @@
+import random
+import string
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import API, auth_headers, captured_statements
+
+USERS = 50
+POSTS = 5000
+EXERCISES = 5000
+SEARCHED_USERS = 20000
+STATUSES = ("WAITING", "APPROVED", "REJECTED")
+
+
+@pytest.fixture()
+def seeded(client, db):
+    """
+    Enough rows, with ANALYZE statistics, for SQLite to plan like it would
+    on a real database instead of falling back to scans of tiny tables.
+    """
+    rng = random.Random(9)
+    start = datetime(2023, 1, 1)
+
+    def time_at(minutes: int) -> str:
+        return (start + timedelta(minutes=minutes)).isoformat(" ", "microseconds")
+
+    db.executemany(
+        "INSERT INTO users (id, name, user_type, password_hash) "
+        "VALUES (?, ?, 'USER', 'x')",
+        [(user_id, f"user{user_id}") for user_id in range(2, USERS + 2)],
+    )
+    db.executemany(
+        "INSERT INTO posts (title, time, owner, status) VALUES (?, ?, ?, ?)",
+        [
+            (f"post {n}", time_at(n), rng.randint(1, USERS + 1), rng.choice(STATUSES))
+            for n in range(POSTS)
+        ],
+    )
+    db.executemany(
+        "INSERT INTO exercises (text, time, owner) VALUES (?, ?, ?)",
+        [
+            (f"exercise {n}", time_at(n), rng.randint(1, USERS + 1))
+            for n in range(EXERCISES)
+        ],
+    )
+    db.commit()
+    db.execute("ANALYZE")
+    db.commit()
+    return db
+
+
+def plan_of(db, client, path: str, table: str, **kwargs) -> list[str]:
+    """
+    Query plan of the ordered `table` query a request to `path` runs.
+    """
+    with captured_statements() as statements:
+        response = client.get(f"{API}{path}", **kwargs)
+    assert response.status_code == 200, response.text
+
+    matching = [
+        (statement, parameters)
+        for statement, parameters in statements
+        if f"FROM {table}" in statement and "ORDER BY" in statement
+    ]
+    assert len(matching) == 1, statements
+    statement, parameters = matching[0]
+    rows = db.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return [row["detail"] for row in rows]
+
+
+def assert_uses_index(plan: list[str], table: str, index: str) -> None:
+    assert any(
+        detail.startswith(f"SEARCH {table} USING INDEX {index}")
+        or detail.startswith(f"SCAN {table} USING INDEX {index}")
+        for detail in plan
+    ), plan
+    assert not any(detail == f"SCAN {table}" for detail in plan), plan
+    assert not any("TEMP B-TREE" in detail for detail in plan), plan
+
+
+def test_exercises_by_owner_use_owner_time_index(client, seeded):
+    plan = plan_of(
+        seeded, client, "/exercises/all/", "exercises", headers=auth_headers(2)
+    )
+    assert_uses_index(plan, "exercises", "ix_exercises_owner_time")
+
+
+def test_posts_of_an_owner_use_owner_time_index(client, seeded):
+    plan = plan_of(seeded, client, "/posts/", "posts", params={"owner": 2})
+    assert_uses_index(plan, "posts", "ix_posts_owner_time")
+
+
+def test_all_posts_use_time_index(client, seeded):
+    plan = plan_of(seeded, client, "/posts/", "posts")
+    assert_uses_index(plan, "posts", "ix_posts_time_id")
+
+
+def test_daily_exercise_uses_owner_time_index(client, seeded):
+    plan = plan_of(seeded, client, "/exercises/daily/", "exercises")
+    assert_uses_index(plan, "exercises", "ix_exercises_owner_time")
+
+
+def test_approved_feed_uses_status_time_index(client, seeded):
+    plan = plan_of(seeded, client, "/posts/feed", "posts")
+    assert_uses_index(plan, "posts", "ix_posts_status_time")
+
+
+def test_next_posts_page_seeks_time_index(client, seeded):
+    cursor = client.get(f"{API}/posts/", params={"limit": 10}).json()["next_cursor"]
+    plan = plan_of(
+        seeded, client, "/posts/", "posts", params={"limit": 10, "cursor": cursor}
+    )
+    assert_uses_index(plan, "posts", "ix_posts_time_id")
+    assert any("(time<?" in detail for detail in plan), plan
+
+
+@pytest.fixture()
+def user_name_search(client, db, sqlite_migration):
+    """
+    The users_name_fts trigram table and its triggers, with enough users
+    for SQLite to prefer it over scanning the table.
+    """
+    sqlite_migration("fe9b535469e9")
+    rng = random.Random(11)
+    db.executemany(
+        "INSERT INTO users (name, user_type, password_hash) VALUES (?, 'USER', 'x')",
+        [
+            ("".join(rng.choices(string.ascii_lowercase, k=12)),)
+            for _ in range(SEARCHED_USERS)
+        ],
+    )
+    db.commit()
+    db.execute("ANALYZE")
+    db.commit()
+    return db
+
+
+def test_user_name_search_uses_trigram_table(client, user_name_search):
+    for params in ({"name": "bcd"}, {"name_prefix": "abc"}):
+        plan = plan_of(
+            user_name_search,
+            client,
+            "/users/admin/",
+            "users",
+            headers=auth_headers(1),
+            params=params,
+        )
+        assert any(
+            detail.startswith("SCAN users_name_fts VIRTUAL TABLE INDEX")
+            for detail in plan
+        ), plan
+        assert "SEARCH users USING INTEGER PRIMARY KEY (rowid=?)" in plan, plan
+        assert not any(detail == "SCAN users" for detail in plan), plan
+
+
+def test_short_user_name_search_scans_name_index(client, user_name_search):
+    # Under three characters there is no trigram, the FTS table would be scanned
+    plan = plan_of(
+        user_name_search,
+        client,
+        "/users/admin/",
+        "users",
+        headers=auth_headers(1),
+        params={"name": "xy"},
+    )
+    assert not any("users_name_fts" in detail for detail in plan), plan
+    assert not any("TEMP B-TREE" in detail for detail in plan), plan
@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+
+from conftest import API
+from db import config as db_config
+
+
+@contextmanager
+def isolation_levels() -> Iterator[list[str | None]]:
+    """
+    Isolation level execution option of every statement sent meanwhile.
+    """
+    levels: list[str | None] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        levels.append(conn.get_execution_options().get("isolation_level"))
+
+    sync_engine = db_config.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        yield levels
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+
+def test_safe_methods_skip_the_transaction(client, user_headers):
+    with isolation_levels() as levels:
+        response = client.get(f"{API}/users/me/", headers=user_headers)
+    assert response.status_code == 200, response.text
+    assert levels and set(levels) == {"AUTOCOMMIT"}
+
+    with isolation_levels() as levels:
+        response = client.put(
+            f"{API}/users/me/", headers=user_headers, json={"password": "new-password"}
+        )
+    assert response.status_code == 200, response.text
+    assert levels and "AUTOCOMMIT" not in levels
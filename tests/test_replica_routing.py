@@ -0,0 +1,89 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from conftest import API
+from db import config as db_config
+from db.models.base import Base
+from settings import settings
+
+
+@pytest.fixture()
+def stale_replica(client, monkeypatch):
+    """
+    An empty replica that never catches up with the primary.
+    """
+    path = Path(tempfile.mkdtemp()) / "replica.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    replica = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    monkeypatch.setattr(db_config, "replica_engines", [replica])
+    monkeypatch.setattr(
+        db_config,
+        "_read_only_replica_engines",
+        [replica.execution_options(isolation_level="AUTOCOMMIT")],
+    )
+    yield replica
+    asyncio.run(replica.dispose())
+
+
+def test_public_get_reads_own_write_from_primary(
+    client, user_headers, stale_replica
+):
+    response = client.post(
+        f"{API}/posts/", headers=user_headers, json={"title": "mine"}
+    )
+    assert response.status_code == 200, response.text
+    post_id = response.json()["id"]
+
+    response = client.get(f"{API}/posts/{post_id}", headers=user_headers)
+    assert response.status_code == 200
+    # Anonymous readers are fine with the replica
+    assert client.get(f"{API}/posts/{post_id}").status_code == 404
+
+
+def test_cache_refills_read_from_primary(client, admin_headers, stale_replica):
+    response = client.post(
+        f"{API}/posts/admin/",
+        headers=admin_headers,
+        json={"title": "approved", "status": "approved"},
+    )
+    assert response.status_code == 200, response.text
+    response = client.post(
+        f"{API}/exercises/",
+        headers=admin_headers,
+        json={"text": "breathe", "time": "2024-01-01T10:00:00"},
+    )
+    assert response.status_code == 200, response.text
+
+    feed = client.get(f"{API}/posts/feed").json()
+    assert [item["title"] for item in feed["items"]] == ["approved"]
+    daily = client.get(f"{API}/exercises/daily/").json()
+    assert daily["text"] == "breathe"
+
+
+def test_expired_write_windows_are_evicted(client, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(db_config, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+
+    for principal_id in range(100):
+        db_config.mark_recent_write(principal_id)
+    db_config.mark_recent_write(0)
+    assert len(db_config._recent_writes) == 100
+
+    clock[0] += settings.READ_YOUR_WRITES_SECONDS / 2
+    db_config.mark_recent_write(0)
+    clock[0] += settings.READ_YOUR_WRITES_SECONDS / 2 + 1
+    db_config.mark_recent_write(100)
+
+    # Only the principal written again within the window is still tracked
+    assert list(db_config._recent_writes) == [0, 100]
+    assert db_config.has_recent_write(0)
+    assert not db_config.has_recent_write(1)
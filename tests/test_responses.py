@@ -0,0 +1,78 @@
+import os
+
+import pytest
+from fastapi import Response
+
+from conftest import API
+from services.responses import ModelORJSONResponse, fast_json_response
+from settings import settings
+
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(1000)
+
+
+@pytest.fixture(params=[False, True], ids=["validated", "fast"])
+def fast_json(request, monkeypatch) -> bool:
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", request.param)
+    return request.param
+
+
+def test_endpoint_status_codes_and_headers(
+    client, admin_headers, fast_json, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path)
+
+    response = client.post(
+        f"{API}/register", json={"name": "carol", "password": "carol-password"}
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["name"] == "carol"
+
+    for expected in (201, 200):
+        response = client.post(
+            f"{API}/uploads/", headers=admin_headers, files={"file": ("a.png", PNG)}
+        )
+        assert response.status_code == expected, response.text
+
+    post_id = client.post(
+        f"{API}/posts/admin/",
+        headers=admin_headers,
+        json={"title": "fast", "status": "approved"},
+    ).json()["id"]
+    response = client.get(f"{API}/posts/{post_id}")
+    assert response.status_code == 200, response.text
+    assert response.json()["title"] == "fast"
+    assert response.headers["etag"]
+
+    response = client.get(f"{API}/exercises/stats/", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["total_sessions"] == 0
+
+    response = client.get(f"{API}/statistics/posts/by-author", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 1
+
+
+def test_fast_response_keeps_status_and_repeated_headers(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    response = Response()
+    response.set_cookie("a", "1")
+    response.set_cookie("b", "2")
+
+    fast = fast_json_response({"ok": True}, status_code=202, response=response)
+
+    assert isinstance(fast, ModelORJSONResponse)
+    assert fast.status_code == 202
+    assert fast.body == b'{"ok":true}'
+    cookies = [value for name, value in fast.raw_headers if name == b"set-cookie"]
+    assert len(cookies) == 2
+    assert len(fast.headers.getlist("content-type")) == 1
+
+
+def test_validated_response_keeps_status(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    response = Response()
+
+    assert fast_json_response({"ok": True}, status_code=202, response=response) == {
+        "ok": True
+    }
+    assert response.status_code == 202
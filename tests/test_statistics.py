@@ -0,0 +1,70 @@
+import asyncio
+
+from conftest import API
+from db.config import SessionLocal
+from db.crud.content_rollup_crud import ContentRollupCrud
+from db.crud.user_counters_crud import UserCountersCrud
+
+
+def reconcile(fix: bool = True) -> tuple[dict, int]:
+    async def run() -> tuple[dict, int]:
+        async with SessionLocal() as session:
+            async with session.begin():
+                drift = await UserCountersCrud(session).reconcile(fix=fix)
+                rollup_drift = await ContentRollupCrud(session).reconcile(fix=fix)
+        return drift, rollup_drift
+
+    return asyncio.run(run())
+
+
+def test_exercise_statistics_follow_writes(client, admin_headers, user_headers):
+    client.post(
+        f"{API}/exercises/bulk",
+        headers=user_headers,
+        json=[
+            {"text": "sit still", "time": f"2024-01-0{day}T10:00:00"}
+            for day in (1, 2, 9)
+        ],
+    )
+    response = client.put(
+        f"{API}/exercises/3",
+        headers=user_headers,
+        params={"text": "sit still", "time": "2024-01-10T10:00:00"},
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get(
+        f"{API}/statistics/exercises/by-time",
+        headers=admin_headers,
+        params={"period": "week", "date_from": "2024-01-01", "date_to": "2024-01-14"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == [
+        {"date_start": "2024-01-01T00:00:00", "exercises_count": 2},
+        {"date_start": "2024-01-08T00:00:00", "exercises_count": 1},
+    ]
+
+    response = client.get(
+        f"{API}/statistics/exercises/by-author",
+        headers=admin_headers,
+        params={"date_from": "2024-01-01", "date_to": "2024-01-31"},
+    )
+    assert response.json() == [{"username": "bob", "exercises_count": 3}]
+    assert reconcile(fix=False) == ({}, 0)
+
+
+def test_reconcile_fixes_drifted_rollups_and_counters(client, user_headers, db):
+    client.post(f"{API}/posts/", headers=user_headers, json={"title": "hello"})
+    db.execute("UPDATE content_rollups SET count = 5")
+    db.execute("UPDATE user_counters SET posts_waiting = 7")
+    db.commit()
+
+    drift, rollup_drift = reconcile()
+    assert drift == {2: {"posts_waiting": (7, 1)}}
+    assert rollup_drift == 1
+    assert reconcile(fix=False) == ({}, 0)
+
+
+def test_statistics_need_a_superuser(client, user_headers):
+    response = client.get(f"{API}/statistics/posts/by-author", headers=user_headers)
+    assert response.status_code == 400
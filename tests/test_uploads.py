@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from sqlalchemy import event
+
+from api.api_v1.endpoints import uploads as uploads_endpoint
+from auth.principal_cache import principal_cache
+from conftest import API
+from db import config as db_config
+from settings import settings
+
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(100_000)
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+def test_upload_streams_without_holding_a_connection(
+    client, user_headers, monkeypatch
+):
+    open_connections = 0
+    during_upload = []
+
+    def on_checkout(*_args):
+        nonlocal open_connections
+        open_connections += 1
+
+    def on_checkin(*_args):
+        nonlocal open_connections
+        open_connections -= 1
+
+    store_upload = uploads_endpoint.store_upload
+
+    async def recording_store_upload(request):
+        during_upload.append(open_connections)
+        return await store_upload(request)
+
+    monkeypatch.setattr(uploads_endpoint, "store_upload", recording_store_upload)
+    sync_engine = db_config.engine.sync_engine
+    event.listen(sync_engine, "checkout", on_checkout)
+    event.listen(sync_engine, "checkin", on_checkin)
+    # A cache miss makes the user lookup hit the database
+    principal_cache.clear()
+    try:
+        response = client.post(
+            f"{API}/uploads/", headers=user_headers, files={"file": ("a.png", PNG)}
+        )
+    finally:
+        event.remove(sync_engine, "checkout", on_checkout)
+        event.remove(sync_engine, "checkin", on_checkin)
+
+    assert response.status_code == 201, response.text
+    assert during_upload == [0]
+
+
+def test_uploads_are_deduplicated_and_served_with_ranges(client, user_headers):
+    first = client.post(
+        f"{API}/uploads/", headers=user_headers, files={"file": ("a.png", PNG)}
+    )
+    second = client.post(
+        f"{API}/uploads/", headers=user_headers, files={"file": ("b.png", PNG)}
+    )
+    assert (first.status_code, second.status_code) == (201, 200)
+    assert first.json()["url"] == second.json()["url"]
+
+    url = first.json()["url"]
+    response = client.get(url)
+    assert response.content == PNG
+    assert "immutable" in response.headers["cache-control"]
+
+    response = client.get(url, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-19/{len(PNG)}"
+    assert response.content == PNG[10:20]
+
+
+def test_non_images_are_rejected(client, user_headers, upload_dir):
+    response = client.post(
+        f"{API}/uploads/",
+        headers=user_headers,
+        files={"file": ("a.txt", b"definitely not an image")},
+    )
+    assert response.status_code == 415
+    assert not list((upload_dir / "tmp").iterdir())
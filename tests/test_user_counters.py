@@ -0,0 +1,65 @@
+from conftest import API
+
+
+def get_counters(client, headers) -> dict:
+    response = client.get(f"{API}/users/me/", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["counters"]
+
+
+def test_admin_post_without_status_counts_as_waiting(client, admin_headers):
+    response = client.post(
+        f"{API}/posts/admin/", headers=admin_headers, json={"title": "no status"}
+    )
+    assert response.status_code == 200, response.text
+
+    counters = get_counters(client, admin_headers)
+    assert counters["posts_waiting"] == 1
+
+    post_id = response.json()["id"]
+    response = client.put(
+        f"{API}/posts/admin/{post_id}",
+        headers=admin_headers,
+        params={"title": "no status", "status": "approved"},
+    )
+    assert response.status_code == 200, response.text
+
+    counters = get_counters(client, admin_headers)
+    assert counters["posts_waiting"] == 0
+    assert counters["posts_approved"] == 1
+
+
+def test_counters_follow_user_posts_and_exercises(client, user_headers):
+    client.post(f"{API}/posts/", headers=user_headers, json={"title": "hello"})
+    client.post(
+        f"{API}/exercises/",
+        headers=user_headers,
+        json={"text": "breathe", "time": "2024-01-01T10:00:00", "duration": 600},
+    )
+
+    counters = get_counters(client, user_headers)
+    assert counters["posts_waiting"] == 1
+    assert counters["exercises"] == 1
+    assert counters["meditation_seconds"] == 600
+
+
+def test_admin_edit_without_status_keeps_the_status(client, admin_headers):
+    response = client.post(
+        f"{API}/posts/admin/",
+        headers=admin_headers,
+        json={"title": "approved", "status": "approved"},
+    )
+    assert response.status_code == 200, response.text
+
+    post_id = response.json()["id"]
+    response = client.put(
+        f"{API}/posts/admin/{post_id}",
+        headers=admin_headers,
+        params={"title": "renamed"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == "approved"
+
+    counters = get_counters(client, admin_headers)
+    assert counters["posts_approved"] == 1
+    assert counters["posts_waiting"] == 0